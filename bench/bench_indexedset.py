@@ -0,0 +1,31 @@
+﻿'''
+Time a !winner draw from an IndexedSet against copying a set into a list
+
+Run from the BotGotsThis directory: python -m pkg.random.bench.bench_indexedset
+'''
+import random
+import timeit
+from typing import List, Set  # noqa: F401
+
+from ..library.indexedset import IndexedSet
+
+sizes: List[int] = [1000, 20000, 200000]
+
+
+def main() -> None:
+    size: int
+    for size in sizes:
+        names: Set[str] = {f'user{i}' for i in range(size)}
+        users: IndexedSet = IndexedSet(names)
+        number: int = max(10, 2000000 // size)
+        copied: float = timeit.timeit(
+            lambda: random.choice(list(names)), number=number) / number
+        indexed: float = timeit.timeit(
+            lambda: users.choice(), number=200000) / 200000
+        print(f'{size:>7} members: random.choice(list(set)) '
+              f'{copied * 1e6:10.2f}us  IndexedSet.choice() '
+              f'{indexed * 1e6:6.2f}us')
+
+
+if __name__ == '__main__':
+    main()
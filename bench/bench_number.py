@@ -0,0 +1,88 @@
+﻿'''
+Time converting large integers to digit strings, and Number arithmetic and
+memory
+
+Run from the BotGotsThis directory: python -m pkg.random.bench.bench_number
+To compare with an older tree, copy this file into a checkout of it. The
+per-digit conversions there are quadratic, pass a smaller largest size as
+the first argument to keep the run short.
+'''
+import sys
+import time
+import timeit
+import tracemalloc
+from typing import Callable, List, Tuple  # noqa: F401
+
+from ..library.number import Number
+
+sizes: List[int] = [100, 1000, 10000, 100000]
+
+conversions: List[Tuple[str, Callable[[int], str]]] = [
+    ('base 10', lambda value: Number.str_positive_base(value, 10)),
+    ('base 7', lambda value: Number.str_positive_base(value, 7)),
+    ('base -10', lambda value: Number.str_negative_base(value, -10)),
+    ('balanced', Number.str_balanced_base),
+    ]
+
+
+def seconds(function: Callable[[int], str], value: int) -> float:
+    start: float = time.perf_counter()
+    function(value)
+    return time.perf_counter() - start
+
+
+def conversionTable(largest: int) -> None:
+    # Builds any digit and power tables before timing
+    _: str
+    for _, function in conversions:
+        function(10 ** 200)
+    print(f'{"digits":>8}' + ''.join(f'{name:>12}' for name, _ in conversions))
+    size: int
+    for size in sizes:
+        if size > largest:
+            break
+        # A value with about size decimal digits, not a power of any base
+        value: int = 7 ** int(size / 0.845) + 12345
+        print(f'{size:>8}' + ''.join(
+            f'{seconds(function, value) * 1e3:10.2f}ms'
+            for _, function in conversions))
+
+
+def objectSize(value: Number) -> int:
+    size: int = sys.getsizeof(value)
+    if hasattr(value, '__dict__'):
+        size += sys.getsizeof(value.__dict__)
+    return size
+
+
+def numberTable() -> None:
+    value: Number = Number(12345, -7)
+    number: int = 200000
+    add: float = timeit.timeit(lambda: value + 1, number=number) / number
+    asBase: float = timeit.timeit(
+        lambda: value.as_base(16), number=number) / number
+    tracemalloc.start()
+    numbers: List[Number] = [Number(i, 10) for i in range(100000)]
+    # Only kept where Number caches its rendering
+    n: Number
+    for n in numbers:
+        str(n)
+    memory: int = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f'Number + 1              {add * 1e6:.2f}us')
+    print(f'as_base(16)             {asBase * 1e6:.2f}us')
+    print(f'100k rendered Numbers   {memory / 1e6:.1f}MB')
+    print(f'per object              {objectSize(value)}B')
+
+
+def main() -> None:
+    if hasattr(sys, 'set_int_max_str_digits'):
+        sys.set_int_max_str_digits(0)
+    largest: int = int(sys.argv[1]) if len(sys.argv) > 1 else sizes[-1]
+    conversionTable(largest)
+    print()
+    numberTable()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+﻿'''
+Time !roll per kind of argument, without the event loop
+
+Run from the BotGotsThis directory: python -m pkg.random.bench.bench_roll
+To compare with an older tree, copy this file into a checkout of it.
+'''
+import asyncio
+import timeit
+from typing import Any, Awaitable, List, Optional  # noqa: F401
+
+from lib.data.message import Message
+
+from .. import channel
+
+messages: List[str] = [
+    '!roll', '!roll 0xFF', '!roll 0b1010', '!roll 100', '!roll 1.5',
+    '!roll 1+2i', '!roll float', '!roll 1 2.5', '!roll 0x10 0xFF']
+
+
+class Data:
+    async def hasFeature(self, channel: str, feature: str) -> bool:
+        return False
+
+    async def getChatProperty(self, channel: str, key: str) -> Optional[str]:
+        return None
+
+
+class Chat:
+    channel: str = 'bench'
+
+    def __init__(self) -> None:
+        self.sent: List[str] = []
+
+    def send(self, message: str) -> None:
+        self.sent.append(message)
+
+
+class Args:
+    def __init__(self, message: str) -> None:
+        self.message: Message = Message(message)
+        self.data: Data = Data()
+        self.chat: Chat = Chat()
+
+
+def drive(coroutine: Awaitable[Any]) -> None:
+    # The fake data never suspends once the snapshot is loaded, so the
+    # command finishes on its first step
+    try:
+        coroutine.send(None)  # type: ignore
+    except StopIteration:
+        return
+    raise RuntimeError('the command suspended')
+
+
+def main() -> None:
+    loop: asyncio.AbstractEventLoop = asyncio.get_event_loop()
+    message: str
+    for message in messages:
+        args: Args = Args(message)
+        # Loads the channel snapshot
+        loop.run_until_complete(channel.commandRoll(args))
+        number: int = 50000
+        seconds: float = timeit.timeit(
+            lambda: drive(channel.commandRoll(args)), number=number)
+        args.chat.sent.clear()
+        print(f'{message:18} {seconds / number * 1e6:6.2f}us')
+
+
+if __name__ == '__main__':
+    main()
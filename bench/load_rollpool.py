@@ -0,0 +1,97 @@
+﻿'''
+Load test of costly rolls: the latency of a light !roll while big rolls run
+
+A light "!roll 20" is handled every 2ms in one channel while six
+"!roll-7 <60000 digits>" run across three other channels, first all on the
+event loop, then in the process pool from a cold start and again warm.
+
+Run from the BotGotsThis directory: python -m pkg.random.bench.load_rollpool
+'''
+import asyncio
+import sys
+import time
+from typing import Any, Awaitable, List, Optional  # noqa: F401
+
+from lib.data.message import Message
+
+from .. import channel, rollcost, settings
+
+heavyRoll: str = '!roll-7 ' + '6' * 60000
+heavyCount: int = 6
+lightInterval: float = 0.002
+
+
+class Data:
+    async def hasFeature(self, channel: str, feature: str) -> bool:
+        return False
+
+    async def getChatProperty(self, channel: str, key: str) -> Optional[str]:
+        return None
+
+
+class Chat:
+    def __init__(self, channel: str) -> None:
+        self.channel: str = channel
+        self.sent: List[str] = []
+
+    def send(self, message: str) -> None:
+        self.sent.append(message)
+
+
+class Args:
+    def __init__(self, message: str, channel: str) -> None:
+        self.message: Message = Message(message)
+        self.data: Data = Data()
+        self.chat: Chat = Chat(channel)
+
+
+async def scenario(heavy: int) -> str:
+    latencies: List[float] = []
+    stopped: bool = False
+
+    async def light() -> None:
+        while not stopped:
+            start: float = time.perf_counter()
+            await asyncio.sleep(lightInterval)
+            await channel.commandRoll(Args('!roll 20', 'light'))
+            latencies.append(time.perf_counter() - start - lightInterval)
+
+    task: Awaitable[None] = asyncio.ensure_future(light())
+    await asyncio.sleep(0.1)
+    start: float = time.perf_counter()
+    await asyncio.gather(*[
+        channel.commandRollBase(Args(heavyRoll, f'heavy{i % 3}'))
+        for i in range(heavy)])
+    duration: float = time.perf_counter() - start
+    await asyncio.sleep(0.05)
+    stopped = True
+    await task
+    latencies.sort()
+    batch: str = f'{duration:.2f}s' if heavy else '-'
+    return (f'{batch:>11}   '
+            f'{latencies[len(latencies) // 2] * 1e3:.2f}ms / '
+            f'{latencies[int(len(latencies) * 0.99)] * 1e3:.2f}ms / '
+            f'{latencies[-1] * 1e3:.2f}ms')
+
+
+def main() -> None:
+    if hasattr(sys, 'set_int_max_str_digits'):
+        sys.set_int_max_str_digits(0)
+    loop: asyncio.AbstractEventLoop = asyncio.get_event_loop()
+    print(f'{"mode":24} heavy batch   light roll latency p50 / p99 / max')
+    mode: str
+    inlineCost: float
+    heavy: int
+    for mode, inlineCost, heavy in [('inline', 1e9, heavyCount),
+                                    ('process pool (1st fork)', 0.005,
+                                     heavyCount),
+                                    ('process pool (warm)', 0.005,
+                                     heavyCount),
+                                    ('no heavy rolls', 0.005, 0)]:
+        settings.rollInlineCost = inlineCost
+        print(f'{mode:24}', loop.run_until_complete(scenario(heavy)))
+    rollcost.executor().shutdown()
+
+
+if __name__ == '__main__':
+    main()
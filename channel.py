@@ -1,95 +1,130 @@
 ﻿import random
 import re
-from collections import defaultdict
 from datetime import datetime, timedelta  # noqa: F401
 from typing import Any, Awaitable, Callable, Dict, Iterable, List, Match  # noqa: F401,E501
-from typing import Optional, Sequence, Set  # noqa: F401
-
-import aiohttp
+from typing import Optional, Sequence, Set, Tuple  # noqa: F401
 
 import bot
-from lib.api import twitch
 from lib.cache import CacheStore
 from lib.data import ChatCommandArgs
 from lib.data.message import Message
 from lib.helper import parser
-from lib.helper.chat import not_feature, permission, permission_not_feature
+from lib.helper.chat import permission, permission_not_feature
+
+from . import chatters, emotes, follows, prefetch, presence, randomstreams
+from . import rendercache, rollcost, settings, snapshot
+from .library import dice, distribution, number, rolltoken
+from .library.activity import ActivityTracker
+from .library.indexedset import IndexedSet
+
+rollTooExpensive: str = 'The roll is too big to compute'
 
-from .library import number
+
+def channelActivity(sessionData: Dict[Any, Any]) -> ActivityTracker:
+    if 'activity' not in sessionData:
+        sessionData['activity'] = ActivityTracker(
+            settings.activityRetention, settings.winnerWeightHalfLife,
+            settings.winnerWeightCap)
+    return sessionData['activity']
 
 
 async def logLastMessage(args: ChatCommandArgs) -> bool:
-    if 'lastMessage' not in args.chat.sessionData:
-        sessionData: Dict[Any, Any] = args.chat.sessionData
-        sessionData['lastMessage'] = defaultdict(lambda: datetime.min)
-    args.chat.sessionData['lastMessage'][args.nick] = args.timestamp
+    activity: ActivityTracker = channelActivity(args.chat.sessionData)
+    activity.log(args.nick, int(args.timestamp.timestamp()))
+    if 'prefetchChecked' not in args.chat.sessionData:
+        # The first message since the bot joined picks up a winnerNoLurk
+        # set before a restart, without waiting for a !winner
+        args.chat.sessionData['prefetchChecked'] = True
+        noLurk: Optional[str] = await snapshot.getChatProperty(
+            args.data, args.chat.channel, 'winnerNoLurk')
+        prefetch.configure(args.chat.channel, noLurk is not None)
     return False
 
 
 @permission_not_feature(('broadcaster', None),
                         ('moderator', 'winnerbroadcaster'))
 async def commandWinner(args: ChatCommandArgs) -> bool:
-    args.chat.send('The winning user is...')
-
-    url = f'http://tmi.twitch.tv/group/user/{args.chat.channel}/chatters'
-    session: aiohttp.ClientSession
-    response: aiohttp.ClientResponse
-    users: Set[str]
-    async with aiohttp.ClientSession() as session, \
-            session.get(url, timeout=bot.config.httpTimeout) as response:
-        if response.status // 100 in [4, 5]:
-            users = set(args.chat.ircUsers)
-        else:
-            usersFromTwitch: Dict[str, Any] = await response.json()
-            users = set(usersFromTwitch['chatters']['viewers'])
-            users |= set(usersFromTwitch['chatters']['moderators'])
-            users |= set(usersFromTwitch['chatters']['global_mods'])
-            users |= set(usersFromTwitch['chatters']['admins'])
-            users |= set(usersFromTwitch['chatters']['staff'])
-            if not users:
-                users = set(args.chat.ircUsers)
+    count: int = 1
+    if len(args.message) > 1 and args.message[1].isdecimal():
+        try:
+            count = min(max(int(args.message[1]), 1), settings.winnerMaxCount)
+        except ValueError:
+            # Past the digit limit of int()
+            count = settings.winnerMaxCount
+    if count == 1:
+        args.chat.send('The winning user is...')
+    else:
+        args.chat.send('The winning users are...')
+    prefetch.watch(args.chat.channel)
+
+    users: Optional[IndexedSet] = presence.channelUsers(args.chat.channel)
+    if users is None:
+        users = await chatters.getChatters(args.chat.channel)
+    if users is None:
+        users = IndexedSet(args.chat.ircUsers)
 
     if not users:
         args.chat.send('nobody! Twitch, why do you error!')
         return False
 
-    noLurk: Optional[str] = await args.data.getChatProperty(
-        args.chat.channel, 'winnerNoLurk')
-    user: str
-    if noLurk is not None:
-        earliest: datetime = args.timestamp - timedelta(seconds=int(noLurk))
-        for user in set(users):
-            user = user.lower()
-            if user == bot.config.botnick:
-                continue
-            sessionData: Dict[Any, Any] = args.chat.sessionData
-            if ('lastMessage' in sessionData
-                    and sessionData['lastMessage'][user] < earliest):
-                users.discard(user)
-
-    user = random.choice(list(users))
-
-    data: Optional[Dict[str, Any]]
-    try:
-        response, data = await twitch.get_call(
-            args.chat.channel,
-            f'/kraken/users/{user}/follows/channels/{args.chat.channel}',
-            headers={
-                'Accept': 'application/vnd.twitchtv.v3+json',
-                })
-        if user == args.chat.channel:
-            args.chat.send(f'{user}! PogChamp Streamer has won !winner')
-        elif response.status == 404:
-            args.chat.send(f'{user}! (user does not follow this stream)')
-        else:
-            args.chat.send(f'{user}!')
-    except aiohttp.ClientResponseError as e:
-        if e.code != 404:
-            raise
-        args.chat.send(f'{user}! (user does not follow this stream)')
+    noLurk: Optional[str] = await snapshot.getChatProperty(
+        args.data, args.chat.channel, 'winnerNoLurk')
+    prefetch.configure(args.chat.channel, noLurk is not None)
+    if noLurk is not None and 'activity' in args.chat.sessionData:
+        activity: ActivityTracker = args.chat.sessionData['activity']
+        activity.retention = max(activity.retention, int(noLurk))
+        earliest: int = int(args.timestamp.timestamp()) - int(noLurk)
+        activeUsers: IndexedSet = IndexedSet(
+            user for user in activity.chattedSince(earliest)
+            if user in users)
+        if bot.config.botnick in users:
+            activeUsers.add(bot.config.botnick)
+        users = activeUsers
+
+    rng: random.Random = randomstreams.channelRandom(args.chat.channel)
+    winners: List[str]
+    if ('activity' in args.chat.sessionData
+            and await snapshot.hasFeature(args.data, args.chat.channel,
+                                          'winnerweighted')):
+        winners = args.chat.sessionData['activity'].sampleWeighted(
+            users, min(count, len(users)), settings.winnerWeightBase,
+            int(args.timestamp.timestamp()), rng,
+            settings.winnerWeightAttempts)
+    else:
+        winners = users.sample(min(count, len(users)), rng)
+    if not winners:
+        args.chat.send('nobody!')
+        return True
+
+    followings: List[Optional[bool]] = await follows.followStatuses(
+        args.chat.channel, winners, settings.followDeadline)
+    messages: List[str] = [winnerMessage(user, args.chat.channel, following)
+                           for user, following in zip(winners, followings)]
+    args.chat.send(packMessages(messages))
     return True
 
 
+def winnerMessage(user: str, channel: str, following: Optional[bool]) -> str:
+    if user == channel:
+        return f'{user}! PogChamp Streamer has won !winner'
+    elif following is False:
+        return f'{user}! (user does not follow this stream)'
+    else:
+        return f'{user}!'
+
+
+def packMessages(parts: Iterable[str], separator: str=' ') -> List[str]:
+    messages: List[str] = []
+    part: str
+    for part in parts:
+        if (messages and len(messages[-1]) + len(separator) + len(part)
+                <= settings.messageLimit):
+            messages[-1] += separator + part
+        else:
+            messages.append(part)
+    return messages
+
+
 @permission('broadcaster')
 async def commandSetNoLurk(args: ChatCommandArgs) -> bool:
     match: Optional[Match[str]] = None
@@ -112,289 +147,417 @@ async def commandSetNoLurk(args: ChatCommandArgs) -> bool:
             duration += int(groups[4])
             await args.data.setChatProperty(
                 args.chat.channel, 'winnerNoLurk', str(duration))
+            snapshot.invalidate(args.chat.channel)
+            prefetch.configure(args.chat.channel, True)
+            activity: ActivityTracker = channelActivity(
+                args.chat.sessionData)
+            activity.retention = max(activity.retention, duration)
         args.chat.send(f'''\
 The !winner command will pick users who chatted in the last {duration} seconds\
 ''')
     else:
         await args.data.setChatProperty(args.chat.channel, 'winnerNoLurk')
+        snapshot.invalidate(args.chat.channel)
+        prefetch.configure(args.chat.channel, False)
         args.chat.send('Allowed all users for !winner')
     return True
 
 
-@not_feature('noroll')
+@snapshot.not_feature('noroll')
 @permission('moderator')
 async def commandRoll(args: ChatCommandArgs) -> bool:
-    RollFunction = Callable[[Message, CacheStore], Awaitable[Optional[str]]]
-    rollFunctions: List[RollFunction] = []
-
-    if await args.data.hasFeature(args.chat.channel, 'roll.exe'):
-        rollFunctions += [rollExe]
-    if await args.data.hasFeature(args.chat.channel, 'roll.emote'):
-        rollFunctions += [rollEmote]
-
-    rollFunctions += [
-        rollHexadecimal,
-        rollBinary,
-        rollInteger,
-        rollFloat,
-        rollComplex,
-        ]
-    rollFunc: RollFunction
-    for rollFunc in rollFunctions:
-        value: Optional[str] = await rollFunc(args.message, args.data)
-        if value is not None:
-            args.chat.send(f'The roll returns {value}!')
+    tokens: List[rolltoken.RollToken] = [
+        rolltoken.classify(args.message[i])
+        for i in range(1, min(len(args.message), 3))]
+
+    rng: random.Random = randomstreams.channelRandom(args.chat.channel)
+    value: Optional[str] = None
+    keyword: str = ''
+    if tokens and tokens[0].kind == rolltoken.Keyword:
+        keyword = tokens[0].prefix
+    if (keyword == 'exe'
+            and await snapshot.hasFeature(args.data, args.chat.channel,
+                                          'roll.exe')):
+        value = rollExe()
+    elif (keyword == 'emote'
+            and await snapshot.hasFeature(args.data, args.chat.channel,
+                                          'roll.emote')):
+        value = await rollEmote(args.message, args.data, rng)
+    else:
+        try:
+            value = await rollcost.run(args.chat.channel,
+                                       rollcost.rollTokensCost(tokens),
+                                       rollTokens, tokens, rng=rng)
+        except rollcost.TooExpensive:
+            args.chat.send(rollTooExpensive)
             return True
-    args.chat.send('The roll returns Kappa !')
+
+    if value is not None:
+        if tokens and tokens[0].kind == rolltoken.Dice:
+            # Kept for !roll-stats, the total leads the reply
+            args.chat.sessionData['lastDiceRoll'] = (
+                tokens[0].text, int(value.split(' ', 1)[0]))
+        args.chat.send(f'The roll returns {value}!')
+    else:
+        args.chat.send('The roll returns Kappa !')
     return True
 
 
-async def rollExe(message: Message, data: CacheStore) -> Optional[str]:
-    if len(message) >= 2 and message.lower[1] == 'exe':
-        return 'http://i.imgur.com/CFyCRkP.jpg '
+def rollTokens(tokens: Sequence[rolltoken.RollToken],
+               rng: random.Random) -> Optional[str]:
+    if not tokens:
+        return rollInteger(1, 6, rng)
+    first: rolltoken.RollToken = tokens[0]
+    if len(tokens) == 1:
+        if first.kind == rolltoken.Dice:
+            plan: Optional[dice.DicePlan] = dice.parse(first.text)
+            if plan is None:
+                return None
+            return rollDice(plan, rng)
+        if first.kind in [rolltoken.Hexadecimal, rolltoken.Binary]:
+            return rollRadix(0, int(first.digits, first.base), first.prefix,
+                             first.base, len(first.digits), rng)
+        if first.kind == rolltoken.Integer:
+            value: Optional[str] = None
+            try:
+                value = rollInteger(1, int(first.text), rng)
+            except ValueError:
+                # Past the digit limit of int() and str(), rolled as a float
+                pass
+            if value is not None:
+                return value
+            return rollFloat(0.0, float(first.text), rng)
+        if first.kind == rolltoken.Float:
+            return rollFloat(0.0, float(first.text), rng)
+        if first.kind == rolltoken.Keyword:
+            if first.prefix == 'float':
+                return rollFloat(0.0, 1.0, rng)
+            if first.prefix == 'complex':
+                return rollComplex(0.0 + 0.0j, 1.0 + 1.0j, rng)
+            return None
+        if first.isComplex:
+            return rollComplex(0.0 + 0.0j, parseComplex(first.text), rng)
+        return None
+
+    second: rolltoken.RollToken = tokens[1]
+    if (first.kind == second.kind
+            and first.kind in [rolltoken.Hexadecimal, rolltoken.Binary]):
+        return rollRadix(int(first.digits, first.base),
+                         int(second.digits, second.base), first.prefix,
+                         first.base, len(second.digits), rng)
+    if first.kind == second.kind == rolltoken.Integer:
+        try:
+            value = rollInteger(int(first.text), int(second.text), rng)
+        except ValueError:
+            value = None
+        if value is not None:
+            return value
+    numeric: List[str] = [rolltoken.Integer, rolltoken.Float]
+    if first.kind in numeric and second.kind in numeric:
+        return rollFloat(float(first.text), float(second.text), rng)
+    if first.isComplex and second.isComplex:
+        return rollComplex(parseComplex(first.text),
+                           parseComplex(second.text), rng)
     return None
 
 
-async def rollHexadecimal(message: Message, data: CacheStore) -> Optional[str]:
-    pattern: str = r'^(0[xX]|\$)([0-9a-fA-F]+)$'
-    minInt: Optional[int] = None
-    maxInt: Optional[int] = None
-    prefix: Optional[str] = None
-    numLen: Optional[int] = None
-    if len(message) < 2:
-        return None
-    elif len(message) == 2:
-        match = re.match(pattern, message[1])
-        if match is not None:
-            minInt = 0
-            maxInt = int(match.group(2), 16)
-            prefix = str(match.group(1))
-            numLen = len(match.group(2))
-        else:
-            return None
-    elif len(message) > 2:
-        minMatch = re.match(pattern, message[1])
-        maxMatch = re.match(pattern, message[2])
-        if minMatch is not None and maxMatch is not None:
-            minInt = int(minMatch.group(2), 16)
-            maxInt = int(maxMatch.group(2), 16)
-            prefix = str(minMatch.group(1))
-            numLen = len(maxMatch.group(2))
-        else:
-            return None
-    if minInt is None and maxInt is None and numLen is None and prefix is None:
-        return None
+def rollExe() -> str:
+    return 'http://i.imgur.com/CFyCRkP.jpg '
+
+
+def rollRadix(minInt: int,
+              maxInt: int,
+              prefix: str,
+              base: int,
+              numLen: int,
+              rng: random.Random) -> Optional[str]:
     if minInt > maxInt:
         return None
     elif minInt == maxInt:
-        return prefix + number.positiveBaseStr(minInt, 16).rjust(numLen, '0')
+        return prefix + rendercache.render(minInt, base, numLen)
     else:
-        i = int(random.randint(minInt, maxInt))
-        return prefix + number.positiveBaseStr(i, 16).rjust(numLen, '0')
+        return prefix + rendercache.roll(minInt, maxInt, base, numLen,
+                                         rng)[1]
 
 
-async def rollBinary(message: Message, data: CacheStore) -> Optional[str]:
-    pattern: str = r'^(0[bB]|%)([01]+)$'
-    minInt: Optional[int] = None
-    maxInt: Optional[int] = None
-    prefix: Optional[str] = None
-    numLen: Optional[int] = None
-    if len(message) < 2:
-        return None
-    elif len(message) == 2:
-        match: Match[str] = re.match(pattern, message[1])
-        if match is not None:
-            minInt = 0
-            maxInt = int(match.group(2), 2)
-            prefix = str(match.group(1))
-            numLen = len(match.group(2))
-        else:
-            return None
-    elif len(message) > 2:
-        minMatch = re.match(pattern, message[1])
-        maxMatch = re.match(pattern, message[2])
-        if minMatch is not None and maxMatch is not None:
-            minInt = int(minMatch.group(2), 2)
-            maxInt = int(maxMatch.group(2), 2)
-            prefix = str(minMatch.group(1))
-            numLen = len(maxMatch.group(2))
-        else:
-            return None
-    if minInt is None and maxInt is None and numLen is None and prefix is None:
-        return None
+def rollInteger(minInt: int,
+                maxInt: int,
+                rng: random.Random) -> Optional[str]:
     if minInt > maxInt:
         return None
     elif minInt == maxInt:
-        return prefix + number.positiveBaseStr(minInt, 2).rjust(numLen, '0')
+        return str(minInt)
     else:
-        i = int(random.randint(minInt, maxInt))
-        return prefix + number.positiveBaseStr(i, 2).rjust(numLen, '0')
-
-
-async def rollInteger(message: Message, data: CacheStore) -> Optional[str]:
-    try:
-        minInt: int = 1
-        maxInt: int = 6
-        if len(message) == 1:
-            pass
-        elif len(message) == 2:
-            maxInt = int(message[1])
-        elif len(message) > 2:
-            minInt = int(message[1])
-            maxInt = int(message[2])
-
-        if minInt > maxInt:
-            return None
-        elif minInt == maxInt:
-            return str(minInt)
+        return str(rng.randint(minInt, maxInt))
+
+
+def rollFloat(minFloat: float, maxFloat: float, rng: random.Random) -> str:
+    return str(rng.uniform(minFloat, maxFloat))
+
+
+def rollDice(plan: dice.DicePlan, rng: random.Random) -> str:
+    result: dice.DiceRoll = dice.roll(plan, rng, settings.diceMaxExplosions)
+    if len(plan.terms) == 1 and plan.dice == 1:
+        return str(result.total)
+    # Every die, or failing that every term's total, if it fits in chat
+    limit: int = settings.messageLimit - len('The roll returns !')
+    full: bool
+    for full in [True, False]:
+        if full and plan.dice * 3 > limit:
+            continue
+        if not full and len(plan.terms) == 1:
+            break
+        text: str = f'{result.total} = {diceDetail(result, full)}'
+        if len(text) <= limit:
+            return text
+    return str(result.total)
+
+
+def diceDetail(result: dice.DiceRoll, full: bool) -> str:
+    text: str = ''
+    termRoll: dice.TermRoll
+    for termRoll in result.terms:
+        term: dice.DiceTerm = termRoll.term
+        part: str
+        if not term.sides:
+            part = str(term.count)
+        elif full:
+            dropped: Set[int] = set(termRoll.dropped)
+            part = '[' + ', '.join(f'({value})' if i in dropped else str(value)
+                                   for i, value in enumerate(termRoll.values))
+            part += ']'
         else:
-            return str(random.randint(minInt, maxInt))
-    except Exception:
-        return None
+            part = f'{term.text} ({abs(termRoll.subtotal)})'
+        if text:
+            text += ' - ' if term.sign < 0 else ' + '
+        elif term.sign < 0:
+            text = '-'
+        text += part
+    return text
 
 
-async def rollFloat(message: Message, data: CacheStore) -> Optional[str]:
+@snapshot.not_feature('noroll')
+@permission('moderator')
+async def commandRollStats(args: ChatCommandArgs) -> bool:
+    last: Optional[Tuple[str, int]]
+    last = args.chat.sessionData.get('lastDiceRoll')
+    expression: Optional[str] = None
+    query: Optional[str] = None
+    if len(args.message) > 1:
+        if rolltoken.classify(args.message[1]).kind == rolltoken.Dice:
+            expression = args.message[1]
+            if len(args.message) > 2:
+                query = args.message[2]
+        elif last is not None:
+            expression = last[0]
+            query = args.message[1]
+    elif last is not None:
+        expression = last[0]
+    plan: Optional[dice.DicePlan] = None
+    if expression is not None:
+        plan = dice.parse(expression)
+    if plan is None:
+        args.chat.send('Give me some dice, like !roll-stats 4d6kh3 >=15')
+        return True
+    if not distribution.supported(plan):
+        args.chat.send('Dice that both keep and explode have no exact odds')
+        return True
+    lastTotal: Optional[int] = None
+    if last is not None and dice.parse(last[0]) == plan:
+        lastTotal = last[1]
     try:
-        minFloat: float = 0.0
-        maxFloat: float = 1.0
-        if len(message) == 2:
-            if message.lower[1] in ['float', 'double']:
-                pass
-            else:
-                maxFloat = float(message[1])
-        elif len(message) > 2:
-            minFloat = float(message[1])
-            maxFloat = float(message[2])
-
-        return str(random.uniform(minFloat, maxFloat))
-    except Exception:
-        return None
+        args.chat.send(await rollcost.run(
+            args.chat.channel, rollcost.statsCost(plan), rollStats, plan,
+            query, lastTotal, rng=None))
+    except rollcost.TooExpensive:
+        args.chat.send(rollTooExpensive)
+    return True
 
 
-async def rollComplex(message: Message, data: CacheStore) -> Optional[str]:
-    try:
-        complex1: complex = 0.0 + 0.0j
-        complex2: complex = 1.0 + 1.0j
-        if len(message) == 2:
-            if message[1] in ['complex', 'imaginary']:
-                pass
+def rollStats(plan: dice.DicePlan,
+              query: Optional[str],
+              lastTotal: Optional[int]) -> str:
+    '''
+    The reply to !roll-stats: the plan's spread, the chance of the query
+    and the percentile rank of the channel's last roll of the same dice
+    '''
+    stats: distribution.Distribution = distribution.distribution(plan)
+    msg: str = (f'{plan.text}: mean {stats.mean:.2f}, standard deviation '
+                f'{stats.deviation:.2f}')
+    if not any(term.explode for term in plan.terms):
+        msg += f', {stats.minimum} to {stats.maximum}'
+    msg += (
+        f'; 10%: {stats.percentile(0.1)}, 25%: {stats.percentile(0.25)}, '
+        f'median {stats.percentile(0.5)}, 75%: {stats.percentile(0.75)}, '
+        f'90%: {stats.percentile(0.9)}')
+    if query is not None:
+        # Bounded like the numbers of a dice expression, longer ones would
+        # be over int()'s digit limit
+        match: Optional[Match[str]] = re.fullmatch(
+            r'(<=|>=|<|>|=)?(-?\d{1,1000})|(-?\d{1,1000})\.\.(-?\d{1,1000})',
+            query)
+        if match is not None:
+            low: int = stats.minimum
+            high: int = stats.maximum
+            if match.group(3) is not None:
+                low, high = int(match.group(3)), int(match.group(4))
+                query = f'{low} to {high}'
             else:
-                complex2 = complex(message[1].replace('i', 'j'))
-        elif len(message) > 2:
-            complex1 = complex(message[1].replace('i', 'j'))
-            complex2 = complex(message[2].replace('i', 'j'))
-
-        r = random.uniform(complex1.real, complex2.real)
-        i = random.uniform(complex1.imag, complex2.imag)
-        c = str(complex(r, i))
-        for item in {'j': 'i', '(': '', ')': ''}.items():
-            c = c.replace(item[0], item[1])
-
-        return c
-    except Exception:
-        return None
-
-
-async def rollEmote(message: Message, data: CacheStore) -> Optional[str]:
+                value: int = int(match.group(2))
+                operator: str = match.group(1) or '='
+                if operator in ['=', '>=', '>']:
+                    low = value + (operator == '>')
+                if operator in ['=', '<=', '<']:
+                    high = value - (operator == '<')
+                query = operator + str(value)
+            chance: float = stats.between(low, high)
+            msg += f'. Chance of {query}: {formatChance(chance)}'
+    if lastTotal is not None:
+        msg += (f'. The last roll, {lastTotal}, ranks above '
+                f'{formatChance(stats.rank(lastTotal))} of rolls')
+    return msg
+
+
+def formatChance(chance: float) -> str:
+    return f'{chance * 100:.4g}%'
+
+
+def parseComplex(text: str) -> complex:
+    return complex(text.replace('i', 'j'))
+
+
+def rollComplex(complex1: complex,
+                complex2: complex,
+                rng: random.Random) -> str:
+    r = rng.uniform(complex1.real, complex2.real)
+    i = rng.uniform(complex1.imag, complex2.imag)
+    c = str(complex(r, i))
+    for item in {'j': 'i', '(': '', ')': ''}.items():
+        c = c.replace(item[0], item[1])
+    return c
+
+
+async def rollEmote(message: Message,
+                    data: CacheStore,
+                    rng: random.Random) -> Optional[str]:
     if len(message) >= 2 and message.lower[1] == 'emote':
-        num = 1
+        num: int = 1
         if len(message) >= 3:
-            try:
-                num = int(message[2])
-            except Exception:
-                pass
-        emoteSets: Optional[Set[int]] = await data.twitch_get_bot_emote_set()
-        if emoteSets is None:
-            return None
-        if not await data.twitch_load_emotes(emoteSets):
-            return None
-        emotes: Optional[Dict[int, str]] = await data.twitch_get_emotes()
-        if emotes is None:
+            token: rolltoken.RollToken = rolltoken.classify(message[2])
+            if token.kind == rolltoken.Integer:
+                try:
+                    num = int(token.text)
+                except ValueError:
+                    # Past the digit limit of int()
+                    pass
+        index: Optional[emotes.EmoteIndex] = await emotes.emoteIndex(data)
+        if index is None:
             return None
-        emoteIds: List[int] = list(emotes.keys())
-        randomEmotes: Iterable[str]
-        randomEmotes = (emotes[random.choice(emoteIds)] for i in range(num))
+        # Never draw more emotes than fit in a single chat message
+        limit: int = settings.messageLimit - len('The roll returns !')
+        num = max(min(num, limit // (index.shortest + 1)), 0)
+        randomEmotes: List[str] = rng.choices(index.emotes, k=num)
+        length: int = 0
+        i: int
+        emote: str
+        for i, emote in enumerate(randomEmotes):
+            length += len(emote) + 1
+            if length > limit:
+                del randomEmotes[i:]
+                break
         return ' '.join(randomEmotes) + ' '
     return None
 
 
-@not_feature('noroll')
+@snapshot.not_feature('noroll')
 @permission('moderator')
 async def commandRollBase(args: ChatCommandArgs) -> bool:
+    cost: float = rollcost.rollBaseCost(args.message)
+    try:
+        args.chat.send(await rollcost.run(
+            args.chat.channel, cost, rollBase, args.message,
+            rng=randomstreams.channelRandom(args.chat.channel)))
+    except rollcost.TooExpensive:
+        args.chat.send(rollTooExpensive)
+    return True
+
+
+def rollBase(message: Message, rng: random.Random) -> str:
+    '''
+    The reply to !roll-<base>
+    '''
     full: bool = False
-    if 'full' in args.message.lower:
+    if 'full' in message.lower:
         full = True
 
-    b: List[str] = args.message.command.split('roll-', 1)
+    b: List[str] = message.command.split('roll-', 1)
     base: Optional[str] = None if len(b) < 2 else str(b[1])
 
     minInt: int
     maxInt: int
     msg: str
     i: int
+    rolled: str
     if base is not None and base == 't':
         try:
             minInt = -121
             maxInt = 121
-            if len(args.message) == 1:
+            if len(message) == 1:
                 pass
-            elif len(args.message) == 2:
+            elif len(message) == 2:
                 minInt = 0
-                maxInt = number.balancedBaseInt(args.message[1])
-            elif len(args.message) > 2:
-                minInt = number.balancedBaseInt(args.message[1])
-                maxInt = number.balancedBaseInt(args.message[2])
+                maxInt = number.balancedBaseInt(message[1])
+            elif len(message) > 2:
+                minInt = number.balancedBaseInt(message[1])
+                maxInt = number.balancedBaseInt(message[2])
 
             if minInt > maxInt:
                 minInt, maxInt = maxInt, minInt
 
             if minInt == maxInt:
-                msg = f'The roll returns {number.balancedBaseStr(minInt)}!'
+                msg = f'''\
+The roll returns {rendercache.render(minInt, 't')}!'''
                 if full:
                     msg += f' Value (base 10): {minInt}'
-                args.chat.send(msg)
-                return True
+                return msg
             else:
-                i = int(random.randint(minInt, maxInt))
-                msg = f'The roll returns {number.balancedBaseStr(i)}!'
+                i, rolled = rendercache.roll(minInt, maxInt, 't', rng=rng)
+                msg = f'The roll returns {rolled}!'
                 if full:
                     msg += f''' \
 Value (base 10): {i};  Min (base 10): {minInt}; Max (base 10): {maxInt}'''
-                args.chat.send(msg)
-                return True
+                return msg
         except Exception:
             pass
     elif base == '!':
         try:
             minInt = 0
             maxInt = 119
-            if len(args.message) == 1:
+            if len(message) == 1:
                 pass
-            elif len(args.message) == 2:
+            elif len(message) == 2:
                 minInt = 0
-                maxInt = number.factorialBaseInt(args.message[1])
-            elif len(args.message) > 2:
-                minInt = number.factorialBaseInt(args.message[1])
-                maxInt = number.factorialBaseInt(args.message[2])
+                maxInt = number.factorialBaseInt(message[1])
+            elif len(message) > 2:
+                minInt = number.factorialBaseInt(message[1])
+                maxInt = number.factorialBaseInt(message[2])
 
             if minInt > maxInt:
                 minInt, maxInt = maxInt, minInt
 
             if minInt == maxInt:
                 msg = 'The roll returns '
-                msg += number.factorialBaseStr(minInt) + '!'
+                msg += rendercache.render(minInt, '!') + '!'
                 if full:
                     msg += ' Value (base 10): ' + str(minInt)
-                args.chat.send(msg)
-                return True
+                return msg
             else:
-                i = int(random.randint(minInt, maxInt))
-                msg = f'The roll returns {number.factorialBaseStr(i)}!'
+                i, rolled = rendercache.roll(minInt, maxInt, '!', rng=rng)
+                msg = f'The roll returns {rolled}!'
                 if full:
                     msg += f''' \
 Value (base 10): {i};  Min (base 10): {minInt}; Max (base 10): {maxInt}'''
-                args.chat.send(msg)
-                return True
+                return msg
         except Exception:
             pass
     else:
@@ -404,90 +567,81 @@ Value (base 10): {i};  Min (base 10): {minInt}; Max (base 10): {maxInt}'''
         except Exception:
             baseI = None
         if baseI is None:
-            args.chat.send('The roll needs a valid base')
-            return True
+            return 'The roll needs a valid base'
         if 0 <= baseI < 2:
-            args.chat.send('The roll needs a base larger than or equal to 2')
-            return True
+            return 'The roll needs a base larger than or equal to 2'
         if baseI > 36:
-            args.chat.send('The roll needs a base smaller than or equal to 36')
-            return True
+            return 'The roll needs a base smaller than or equal to 36'
         if -1 <= baseI < 0:
-            args.chat.send('The roll needs a base smaller than or equal to -2')
-            return True
+            return 'The roll needs a base smaller than or equal to -2'
         if baseI < -36:
-            args.chat.send('The roll needs a base larger than or equal to -36')
-            return True
+            return 'The roll needs a base larger than or equal to -36'
         try:
             if baseI < 0:
                 minInt = baseI
                 maxInt = baseI * baseI
-                if len(args.message) == 1:
+                if len(message) == 1:
                     pass
-                elif len(args.message) == 2:
+                elif len(message) == 2:
                     minInt = 1
-                    maxInt = number.negativeBaseInt(args.message[1], baseI)
-                elif len(args.message) > 2:
-                    minInt = number.negativeBaseInt(args.message[1], baseI)
-                    maxInt = number.negativeBaseInt(args.message[2], baseI)
+                    maxInt = number.negativeBaseInt(message[1], baseI)
+                elif len(message) > 2:
+                    minInt = number.negativeBaseInt(message[1], baseI)
+                    maxInt = number.negativeBaseInt(message[2], baseI)
 
                 if minInt > maxInt:
                     minInt, maxInt = maxInt, minInt
 
                 if minInt == maxInt:
                     msg = f'''\
-The roll returns {number.negativeBaseStr(minInt, baseI)}!'''
+The roll returns {rendercache.render(minInt, baseI)}!'''
                     if full:
                         msg += f' Value (base 10): {minInt}'
-                    args.chat.send(msg)
-                    return True
+                    return msg
                 else:
-                    i = int(random.randint(minInt, maxInt))
-                    msg = f'''\
-The roll returns {number.negativeBaseStr(i, baseI)}!'''
+                    i, rolled = rendercache.roll(minInt, maxInt, baseI,
+                                                 rng=rng)
+                    msg = f'The roll returns {rolled}!'
                     if full:
                         msg += f'''\
 Value (base 10): {i}; Min (base 10): {minInt}; Max (base 10): {maxInt}'''
-                    args.chat.send(msg)
-                    return True
+                    return msg
         except Exception:
             pass
         try:
             minInt = 1
             maxInt = int(baseI)
-            if len(args.message) == 1:
+            if len(message) == 1:
                 pass
-            elif len(args.message) == 2:
-                maxInt = int(args.message[1], baseI)
-            elif len(args.message) > 2:
-                minInt = int(args.message[1], baseI)
-                maxInt = int(args.message[2], baseI)
+            elif len(message) == 2:
+                maxInt = int(message[1], baseI)
+            elif len(message) > 2:
+                minInt = int(message[1], baseI)
+                maxInt = int(message[2], baseI)
 
             if minInt > maxInt:
-                args.chat.send('The roll returns Kappa !')
-                return True
+                return 'The roll returns Kappa !'
             elif minInt == maxInt:
                 msg = f'''\
-The roll returns {number.positiveBaseStr(minInt, baseI)}!'''
-                args.chat.send(msg)
-                return True
+The roll returns {rendercache.render(minInt, baseI)}!'''
+                return msg
             else:
-                i = int(random.randint(minInt, maxInt))
-                msg = f'The roll returns {number.positiveBaseStr(i, baseI)}!'
-                args.chat.send(msg)
-                return True
+                i, rolled = rendercache.roll(minInt, maxInt, baseI,
+                                             rng=rng)
+                msg = f'The roll returns {rolled}!'
+                return msg
         except Exception:
             pass
-    args.chat.send('The roll returns Kappa !')
-    return True
+    return 'The roll returns Kappa !'
 
 
-@not_feature('noroll')
+@snapshot.not_feature('noroll')
 @permission('moderator')
 async def commandChoice(args: ChatCommandArgs) -> bool:
     items = parser.parseArguments(args.message[1:])
     if len(args.message) <= 1:
         args.chat.send('Next time give me something to pick from')
         return True
-    args.chat.send(f'I choose {random.choice(items)}!')
+    rng: random.Random = randomstreams.channelRandom(args.chat.channel)
+    args.chat.send(f'I choose {rng.choice(items)}!')
     return True
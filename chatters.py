@@ -0,0 +1,159 @@
+﻿import asyncio
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple  # noqa: F401
+
+import aiohttp
+
+from . import httpclient, settings
+from .library.chatterstream import ChattersDecoder
+from .library.indexedset import IndexedSet
+from .library.metrics import Histograms
+
+ChatterSet = IndexedSet
+
+chatterGroups: Tuple[str, ...] = (
+    'viewers', 'moderators', 'global_mods', 'admins', 'staff')
+
+_cache: Dict[str, Tuple[float, ChatterSet]] = {}
+_inFlight: Dict[str, 'asyncio.Future[Optional[ChatterSet]]'] = {}
+# Response status of the last fetch of each channel
+_statuses: Dict[str, int] = {}
+# Seconds until getChatters returned, by how: 'cached', 'primary' or
+# 'hedge' for the request that answered first, 'failed', or 'deadline'.
+# 'response' holds the time of every complete response
+latencies: Histograms = Histograms()
+
+
+async def getChatters(channel: str) -> Optional[ChatterSet]:
+    '''
+    Merged chatters of the channel, None if twitch did not return any
+
+    The returned set is shared with the cache and must not be modified.
+    Results are cached for settings.chattersTtl seconds and concurrent
+    callers for the same channel share a single request. After
+    settings.chattersDeadline seconds, or when every request failed, the
+    expired cached set, if any, is returned. A request still running goes
+    on to refill the cache
+    '''
+    start: float = time.monotonic()
+    cached: Optional[Tuple[float, ChatterSet]] = _cache.get(channel)
+    if cached is not None:
+        fetched: float
+        users: ChatterSet
+        fetched, users = cached
+        if time.monotonic() - fetched < settings.chattersTtl:
+            latencies.record('cached', time.monotonic() - start)
+            return users
+    try:
+        return await asyncio.wait_for(asyncio.shield(_start(channel)),
+                                      settings.chattersDeadline)
+    except asyncio.TimeoutError:
+        latencies.record('deadline', time.monotonic() - start)
+        return None if cached is None else cached[1]
+    except (aiohttp.ClientError, ValueError):
+        # A failed request or a cut off body, recorded by _fetch
+        return None if cached is None else cached[1]
+
+
+async def fetchChatters(channel: str) -> Optional[ChatterSet]:
+    '''
+    Fetch the channel's chatters into the cache however fresh it is,
+    without a deadline
+    '''
+    return await asyncio.shield(_start(channel))
+
+
+async def refresh(channel: str) -> int:
+    '''
+    Like fetchChatters, but returns the response status
+    '''
+    await fetchChatters(channel)
+    return _statuses[channel]
+
+
+def hedgeDelay() -> float:
+    '''
+    Seconds before a fetch sends a second request: the
+    settings.chattersHedgePercentile of the response times seen so far
+    '''
+    if latencies.count('response') < settings.chattersHedgeSamples:
+        return settings.chattersHedgeDelay
+    return latencies.percentile('response', settings.chattersHedgePercentile)
+
+
+def _start(channel: str) -> 'asyncio.Future[Optional[ChatterSet]]':
+    if channel not in _inFlight:
+        future: asyncio.Future = asyncio.ensure_future(_fetch(channel))
+        _inFlight[channel] = future
+        future.add_done_callback(lambda f: _finished(channel, f))
+    return _inFlight[channel]
+
+
+def _finished(channel: str, future: asyncio.Future) -> None:
+    _inFlight.pop(channel, None)
+    # Callers past their deadline no longer wait for the fetch, its
+    # failure is already recorded
+    if not future.cancelled():
+        future.exception()
+
+
+async def _fetch(channel: str) -> Optional[ChatterSet]:
+    url: str = f'{settings.tmiUrl}/group/user/{channel}/chatters'
+    start: float = time.monotonic()
+    primary: asyncio.Future = asyncio.ensure_future(_request(url))
+    done: Set[asyncio.Future]
+    pending: Set[asyncio.Future]
+    done, pending = await asyncio.wait([primary], timeout=hedgeDelay())
+    if pending:
+        pending.add(asyncio.ensure_future(_request(url)))
+    answer: Optional[asyncio.Future] = None
+    try:
+        while answer is None:
+            if not done:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED)
+            attempt: asyncio.Future
+            for attempt in done:
+                if (attempt.exception() is None
+                        and attempt.result()[1] is not None):
+                    answer = attempt
+            if answer is None and not pending:
+                # Every request failed, report the last one
+                answer = done.pop()
+            done = set()
+    finally:
+        for attempt in pending:
+            attempt.cancel()
+    users: Optional[ChatterSet]
+    try:
+        _statuses[channel], users = answer.result()
+    except Exception:
+        latencies.record('failed', time.monotonic() - start)
+        raise
+    if users is None:
+        latencies.record('failed', time.monotonic() - start)
+        return None
+    latencies.record('primary' if answer is primary else 'hedge',
+                     time.monotonic() - start)
+    _cache[channel] = time.monotonic(), users
+    return users
+
+
+async def _request(url: str) -> Tuple[int, Optional[ChatterSet]]:
+    # The body is decoded as it arrives
+    start: float = time.monotonic()
+    decoder: ChattersDecoder = ChattersDecoder(chatterGroups)
+    names: List[str] = []
+    status: int = await httpclient.getStream(
+        url, lambda chunk: names.extend(decoder.feed(chunk)))
+    if status // 100 in [4, 5]:
+        return status, None
+    names.extend(decoder.close())
+    latencies.record('response', time.monotonic() - start)
+    if not names:
+        return status, None
+    return status, IndexedSet(names)
+
+
+def invalidate(channel: str) -> None:
+    _cache.pop(channel, None)
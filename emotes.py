@@ -0,0 +1,35 @@
+﻿from typing import Dict, FrozenSet, List, NamedTuple, Optional, Set, Tuple  # noqa: F401,E501
+
+from lib.cache import CacheStore
+
+
+class EmoteIndex(NamedTuple):
+    # The bot's emote sets the index was built from
+    version: FrozenSet[int]
+    emotes: Tuple[str, ...]
+    shortest: int
+
+
+_index: Optional[EmoteIndex] = None
+
+
+async def emoteIndex(data: CacheStore) -> Optional[EmoteIndex]:
+    '''
+    Every emote available to the bot, rebuilt only when its emote sets
+    change
+    '''
+    global _index
+    emoteSets: Optional[Set[int]] = await data.twitch_get_bot_emote_set()
+    if emoteSets is None:
+        return None
+    version: FrozenSet[int] = frozenset(emoteSets)
+    if _index is not None and _index.version == version:
+        return _index
+    if not await data.twitch_load_emotes(emoteSets):
+        return None
+    emotes: Optional[Dict[int, str]] = await data.twitch_get_emotes()
+    if not emotes:
+        return None
+    emoteNames: Tuple[str, ...] = tuple(emotes.values())
+    _index = EmoteIndex(version, emoteNames, min(map(len, emoteNames)))
+    return _index
@@ -0,0 +1,66 @@
+﻿import asyncio
+import time
+from typing import Dict, Iterable, List, Optional, Tuple  # noqa: F401
+
+import aiohttp
+
+from . import httpclient, settings
+
+_cache: Dict[str, Dict[str, Tuple[float, bool]]] = {}
+
+
+def cachedFollow(channel: str, user: str) -> Optional[bool]:
+    cached: Optional[Tuple[float, bool]]
+    cached = _cache.get(channel, {}).get(user)
+    if cached is None:
+        return None
+    fetched: float
+    following: bool
+    fetched, following = cached
+    if time.monotonic() - fetched >= settings.followCacheTtl:
+        del _cache[channel][user]
+        return None
+    return following
+
+
+async def isFollowing(channel: str, user: str) -> Optional[bool]:
+    '''
+    Whether the user follows the channel, None when twitch did not say
+    '''
+    following: Optional[bool] = cachedFollow(channel, user)
+    if following is not None:
+        return following
+    status: int
+    try:
+        status, _ = await httpclient.getJson(
+            f'{settings.twitchApiUrl}/kraken/users/{user}/follows/channels/'
+            f'{channel}',
+            headers=httpclient.twitchHeaders())
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+        # ValueError is a 2xx body that is not JSON
+        return None
+    if status == 404:
+        following = False
+    elif status // 100 == 2:
+        following = True
+    else:
+        return None
+    _cache.setdefault(channel, {})[user] = time.monotonic(), following
+    return following
+
+
+async def followStatuses(channel: str,
+                         users: Iterable[str],
+                         timeout: float) -> List[Optional[bool]]:
+    '''
+    Check the users concurrently, giving up on the ones not done in time
+
+    Checks that miss the deadline keep running so their results land in
+    the cache for a later !winner
+    '''
+    tasks: List[asyncio.Future] = [
+        asyncio.ensure_future(isFollowing(channel, user)) for user in users]
+    if not tasks:
+        return []
+    await asyncio.wait(tasks, timeout=timeout)
+    return [task.result() if task.done() else None for task in tasks]
@@ -0,0 +1,117 @@
+﻿import asyncio
+from typing import Any, Callable, Dict, Optional, Tuple  # noqa: F401
+
+import aiohttp
+
+import bot
+
+from . import settings
+
+_session: Optional[aiohttp.ClientSession] = None
+_closer: Optional[asyncio.Future] = None
+_stats: Dict[str, int] = {
+    'sessions': 0,
+    'requests': 0,
+    'errors': 0,
+    'inFlight': 0,
+    'peakInFlight': 0,
+    }
+
+
+def session() -> aiohttp.ClientSession:
+    global _session, _closer
+    if _session is None or _session.closed:
+        connector: aiohttp.TCPConnector = aiohttp.TCPConnector(
+            limit=settings.httpPoolSize,
+            keepalive_timeout=settings.httpKeepAlive)
+        _session = aiohttp.ClientSession(connector=connector)
+        _stats['sessions'] += 1
+    if _closer is None or _closer.done():
+        _closer = asyncio.ensure_future(_closeOnShutdown())
+    return _session
+
+
+def twitchHeaders() -> Dict[str, str]:
+    headers: Dict[str, str] = {
+        'Accept': 'application/vnd.twitchtv.v3+json',
+        }
+    if bot.config.twitchClientId:
+        headers['Client-ID'] = bot.config.twitchClientId
+    return headers
+
+
+async def getJson(url: str,
+                  headers: Optional[Dict[str, str]]=None
+                  ) -> Tuple[int, Optional[Any]]:
+    '''
+    GET the url through the shared session
+
+    Returns the status and the decoded body, the body is None for 4xx and
+    5xx responses
+    '''
+    _stats['requests'] += 1
+    _stats['inFlight'] += 1
+    _stats['peakInFlight'] = max(_stats['peakInFlight'], _stats['inFlight'])
+    try:
+        response: aiohttp.ClientResponse
+        async with session().get(url, headers=headers,
+                                 timeout=bot.config.httpTimeout) as response:
+            if response.status // 100 in [4, 5]:
+                return response.status, None
+            return response.status, await response.json()
+    except Exception:
+        _stats['errors'] += 1
+        raise
+    finally:
+        _stats['inFlight'] -= 1
+
+
+async def getStream(url: str,
+                    feed: Callable[[bytes], Any],
+                    headers: Optional[Dict[str, str]]=None) -> int:
+    '''
+    GET the url through the shared session, passing the body to feed in
+    chunks as they arrive
+
+    Returns the status, the body of 4xx and 5xx responses is not read
+    '''
+    _stats['requests'] += 1
+    _stats['inFlight'] += 1
+    _stats['peakInFlight'] = max(_stats['peakInFlight'], _stats['inFlight'])
+    try:
+        response: aiohttp.ClientResponse
+        async with session().get(url, headers=headers,
+                                 timeout=bot.config.httpTimeout) as response:
+            if response.status // 100 in [4, 5]:
+                return response.status
+            chunk: bytes
+            async for chunk in response.content.iter_any():
+                feed(chunk)
+            return response.status
+    except Exception:
+        _stats['errors'] += 1
+        raise
+    finally:
+        _stats['inFlight'] -= 1
+
+
+def poolStats() -> Dict[str, int]:
+    stats: Dict[str, int] = dict(_stats)
+    stats['limit'] = settings.httpPoolSize
+    stats['open'] = int(_session is not None and not _session.closed)
+    return stats
+
+
+async def close() -> None:
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+async def _closeOnShutdown() -> None:
+    # The bot clears bot.globals.running when it shuts down, the session is
+    # closed on its loop before the loop stops
+    while bot.globals.running and _session is not None:
+        await asyncio.sleep(settings.httpShutdownPoll)
+    await close()
@@ -1,8 +1,10 @@
 ﻿from bot.coroutine import connection as connectionM  # noqa: F401
 from datetime import datetime
 
+from . import presence
+
 
 def parseMessage(connection: 'connectionM.ConnectionHandler',
                  ircmsg: str,
                  now: datetime) -> None:
-    pass
+    presence.handleLine(ircmsg)
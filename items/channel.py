@@ -15,6 +15,7 @@ def commands() -> Mapping[str, Optional[ChatCommand]]:
             '!winner': channel.commandWinner,
             '!setnolurk': channel.commandSetNoLurk,
             '!roll': channel.commandRoll,
+            '!roll-stats': channel.commandRollStats,
             '!choose': channel.commandChoice,
             }
         )
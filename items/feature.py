@@ -8,5 +8,6 @@ def features() -> Mapping[str, Optional[str]]:
             'roll.emote': '!roll emotes',
             'noroll': 'Disable !roll',
             'winnerbroadcaster': '!winner only for broadcaster',
+            'winnerweighted': '!winner odds by chat activity',
             })
     return getattr(features, 'features')
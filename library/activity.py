@@ -0,0 +1,183 @@
+﻿import random
+import sys
+from collections import OrderedDict
+from typing import Callable, Hashable, Iterator, List, Optional, Tuple  # noqa: F401,E501
+
+from .indexedset import IndexedSet
+from .weightedset import WeightedSet
+
+# Weights are rescaled before their growth factor gets this large
+_maxGrowth: float = 2.0 ** 500
+# Beyond this many half-lives every weight counts as decayed away
+_maxHalfLives: float = 1000.0
+
+
+class ActivityTracker:
+    '''
+    Last chat time and activity weight of every nick within a retention
+    window
+
+    Nicks are interned and timestamps are stored as integer epoch seconds.
+    Entries are kept in last-seen order so that idle nicks are evicted from
+    the front in amortized O(1).
+
+    Every message adds 1 to its nick's weight, up to cap, and weights halve
+    every halfLife seconds. Rather than decaying every weight, new messages
+    are added with a growth factor of 2 ** (seconds since an epoch /
+    halfLife), so an update is one O(log n) Fenwick tree change.
+    '''
+    __slots__ = ('retention', 'halfLife', 'cap', '_lastSeen', '_newest',
+                 '_weights', '_epoch')
+
+    def __init__(self,
+                 retention: int,
+                 halfLife: float=600.0,
+                 cap: float=10.0) -> None:
+        self.retention: int = retention
+        self.halfLife: float = halfLife
+        self.cap: float = cap
+        self._lastSeen: OrderedDict = OrderedDict()
+        self._newest: int = 0
+        self._weights: WeightedSet = WeightedSet()
+        self._epoch: int = 0
+
+    def __len__(self) -> int:
+        return len(self._lastSeen)
+
+    def __contains__(self, nick: object) -> bool:
+        return nick in self._lastSeen
+
+    def log(self, nick: str, timestamp: int) -> None:
+        # Clamp so that clock skew never breaks the ordering
+        if timestamp < self._newest:
+            timestamp = self._newest
+        self._newest = timestamp
+        lastSeen: OrderedDict = self._lastSeen
+        if nick in lastSeen:
+            lastSeen.move_to_end(nick)
+            lastSeen[nick] = timestamp
+        else:
+            nick = sys.intern(nick)
+            lastSeen[nick] = timestamp
+        if not self._weights:
+            self._epoch = timestamp
+        growth: float = self._growth(timestamp)
+        if growth > _maxGrowth:
+            self._weights.scale(1 / growth)
+            self._epoch = timestamp
+            growth = 1.0
+        self._weights.set(nick, min(self._weights.weight(nick) + growth,
+                                    self.cap * growth))
+        self.evict(timestamp)
+
+    def lastMessage(self, nick: str) -> int:
+        return self._lastSeen.get(nick, 0)
+
+    def _growth(self, timestamp: int) -> float:
+        return 2.0 ** min((timestamp - self._epoch) / self.halfLife,
+                          _maxHalfLives)
+
+    def weight(self, nick: str, now: int) -> float:
+        '''
+        The nick's decayed message count at now
+        '''
+        return self._weights.weight(nick) / self._growth(now)
+
+    def sampleWeighted(self,
+                       pool: IndexedSet,
+                       k: int,
+                       base: float,
+                       now: int,
+                       rng: Optional[random.Random]=None,
+                       attempts: int=64) -> List[Hashable]:
+        '''
+        k distinct members of pool, each drawn with odds of base plus its
+        weight at now
+
+        Candidates come from the pool uniformly or from the weights, in
+        proportion to their totals, and are rejected when they are not in
+        the pool or already drawn. Members of the weights that are rejected
+        are set aside, so a draw costs O(log n) per candidate. When a
+        winner takes more than attempts candidates, the rest are drawn
+        uniformly
+        '''
+        if not 0 <= k <= len(pool):
+            raise ValueError('Sample larger than population or is negative')
+        rand = random.random if rng is None else rng.random
+        baseTotal: float = base * len(pool) * self._growth(now)
+        chosen: List[Hashable] = []
+        setAside: List[Tuple[Hashable, float]] = []
+        try:
+            while len(chosen) < k:
+                candidate: Optional[Hashable] = self._candidate(
+                    pool, chosen, baseTotal, rand, rng, attempts, setAside)
+                if candidate is None:
+                    remaining: IndexedSet = IndexedSet(
+                        user for user in pool if user not in chosen)
+                    chosen += remaining.sample(k - len(chosen), rng)
+                    break
+                chosen.append(candidate)
+        finally:
+            nick: Hashable
+            weight: float
+            for nick, weight in reversed(setAside):
+                self._weights.set(nick, weight)
+        return chosen
+
+    def _candidate(self,
+                   pool: IndexedSet,
+                   chosen: List[Hashable],
+                   baseTotal: float,
+                   rand: Callable[[], float],
+                   rng: Optional[random.Random],
+                   attempts: int,
+                   setAside: List[Tuple[Hashable, float]]
+                   ) -> Optional[Hashable]:
+        weights: WeightedSet = self._weights
+        candidate: Hashable
+        _: int
+        for _ in range(attempts):
+            total: float = baseTotal + weights.total
+            if total <= 0:
+                break
+            if rand() * total < baseTotal:
+                candidate = pool.choice(rng)
+                if candidate not in chosen:
+                    return candidate
+                continue
+            try:
+                candidate = weights.choice(rng)
+            except IndexError:
+                break
+            setAside.append((candidate, weights.weight(candidate)))
+            weights.set(candidate, 0.0)
+            if candidate in pool and candidate not in chosen:
+                return candidate
+        return None
+
+    def chattedSince(self, earliest: int) -> Iterator[str]:
+        # Walk back from the most recent chatter; O(matching nicks)
+        nick: str
+        for nick in reversed(self._lastSeen):
+            if self._lastSeen[nick] < earliest:
+                break
+            yield nick
+
+    def evict(self, now: int) -> None:
+        earliest: int = now - self.retention
+        lastSeen: OrderedDict = self._lastSeen
+        while lastSeen:
+            nick: str = next(iter(lastSeen))
+            if lastSeen[nick] >= earliest:
+                break
+            del lastSeen[nick]
+            self._weights.discard(nick)
+
+    def memoryUsage(self) -> int:
+        size: int = (sys.getsizeof(self) + sys.getsizeof(self._lastSeen)
+                     + self._weights.memoryUsage())
+        nick: str
+        timestamp: int
+        for nick, timestamp in self._lastSeen.items():
+            size += sys.getsizeof(nick) + sys.getsizeof(timestamp)
+        return size
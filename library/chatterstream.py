@@ -0,0 +1,143 @@
+﻿import codecs
+import json
+import re
+from typing import Any, Iterable, List, Match, Optional, Pattern  # noqa: F401,E501
+
+_string: str = r'"[^"\\]*(?:\\.[^"\\]*)*"'
+# One JSON token after optional whitespace: a string, a structural
+# character, or a number or literal
+_tokenPattern: Pattern[str] = re.compile(
+    rf'\s*(?:({_string})|([{{}}\[\]:,])|([-+.\w]+))')
+# The complete strings at the start of an array of strings, each after
+# its separating comma
+_namesPattern: Pattern[str] = re.compile(rf'(?:\s*,?\s*{_string})*')
+
+
+def _decodeString(token: str) -> str:
+    if '\\' in token:
+        return json.loads(token)
+    return token[1:-1]
+
+
+def _namesEnd(buffer: str, position: int) -> int:
+    '''
+    End of the complete names of an array of strings from position
+    '''
+    close: int = buffer.find(']', position)
+    end: int = len(buffer) if close < 0 else close
+    if buffer.find('\\', position, end) < 0:
+        # Without escapes, an even number of quotes before the last one
+        # means that it closes a name
+        quote: int = buffer.rfind('"', position, end)
+        if buffer.count('"', position, quote + 1) % 2 == 0:
+            return max(quote + 1, position)
+    return _namesPattern.match(buffer, position).end()
+
+
+class ChattersDecoder:
+    '''
+    Incremental decoder of a chatters response body
+
+    Bytes are fed as they arrive and the names in the arrays under
+    "chatters" of the wanted groups are returned as soon as they are
+    complete. The arrays of names are scanned in bulk; the rest of the
+    document is only tokenized to follow its structure.
+    '''
+    __slots__ = ('_groups', '_decoder', '_buffer', '_stack', '_expectKey',
+                 '_inNames', '_done')
+
+    def __init__(self, groups: Iterable[str]) -> None:
+        self._groups: frozenset = frozenset(groups)
+        self._decoder: Any = codecs.getincrementaldecoder('utf-8')()
+        self._buffer: str = ''
+        # Open containers: '{' with its current key, or '['
+        self._stack: List[List[Optional[str]]] = []
+        self._expectKey: bool = False
+        self._inNames: bool = False
+        self._done: bool = False
+
+    def feed(self, chunk: bytes) -> List[str]:
+        self._buffer += self._decoder.decode(chunk)
+        return self._parse(False)
+
+    def close(self) -> List[str]:
+        '''
+        The last names, raises ValueError if the document is incomplete
+        '''
+        self._buffer += self._decoder.decode(b'', True)
+        names: List[str] = self._parse(True)
+        if not self._done or self._buffer.strip():
+            raise ValueError('Incomplete or invalid chatters document')
+        return names
+
+    def _parse(self, final: bool) -> List[str]:
+        names: List[str] = []
+        buffer: str = self._buffer
+        position: int = 0
+        token: Optional[Match[str]]
+        while position < len(buffer):
+            if self._inNames:
+                end: int = _namesEnd(buffer, position)
+                if end > position:
+                    # A leading comma separates them from earlier names
+                    names += json.loads(
+                        '[' + buffer[position:end].lstrip(' \t\r\n,') + ']')
+                position = end
+                token = _tokenPattern.match(buffer, position)
+                if token is None or token.group(2) != ']':
+                    # Only a comma or an incomplete name can be waiting for
+                    # more data
+                    pending: bool = token is None or (
+                        token.group(2) == ','
+                        and _tokenPattern.match(buffer, token.end()) is None)
+                    if not pending or final:
+                        raise ValueError('Invalid chatters array')
+                    break
+                self._inNames = False
+                self._stack.pop()
+                position = token.end()
+                continue
+            token = _tokenPattern.match(buffer, position)
+            if token is None:
+                # Whitespace, an incomplete string or an invalid character
+                if not buffer[position:].strip():
+                    position = len(buffer)
+                elif final:
+                    raise ValueError('Invalid chatters document')
+                break
+            if (token.group(3) is not None and token.end() == len(buffer)
+                    and not final):
+                # The number or literal may continue in the next chunk
+                break
+            position = token.end()
+            self._token(token)
+        self._buffer = buffer[position:]
+        return names
+
+    def _token(self, token: Match[str]) -> None:
+        if self._done:
+            raise ValueError('Data after the chatters document')
+        stack: List[List[Optional[str]]] = self._stack
+        char: Optional[str] = token.group(2)
+        if token.group(1) is not None and self._expectKey:
+            stack[-1][1] = _decodeString(token.group(1))
+            self._expectKey = False
+        elif char == '{':
+            stack.append(['{', None])
+            self._expectKey = True
+        elif char == '[':
+            if not stack:
+                raise ValueError('Chatters document is not an object')
+            stack.append(['[', None])
+            self._inNames = (
+                len(stack) == 3 and stack[0][1] == 'chatters'
+                and stack[1][1] in self._groups)
+        elif char in ['}', ']']:
+            if not stack or stack[-1][0] != ('{' if char == '}' else '['):
+                raise ValueError('Mismatched bracket in chatters document')
+            stack.pop()
+            self._done = not stack
+        elif char == ',':
+            self._expectKey = bool(stack) and stack[-1][0] == '{'
+        elif char != ':' and not stack:
+            raise ValueError('Chatters document is not an object')
@@ -0,0 +1,186 @@
+﻿import random
+import re
+from functools import lru_cache
+from typing import Any, List, NamedTuple, Optional, Pattern, Tuple  # noqa: F401,E501
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# NdM with an optional keep (kN, khN, klN) and explode (!) suffix in either
+# order, or a constant, chained with + and -
+_keep: str = r'[kK][hHlL]?\d+'
+_term: str = rf'(?:\d*[dD]\d+(?:!(?:{_keep})?|{_keep}!?)?|\d+)'
+expressionPattern: str = rf'(?=[^dD]*[dD])[+-]?{_term}(?:[+-]{_term})*'
+_termPattern: Pattern[str] = re.compile(
+    r'([+-]?)(?:(\d*)d(\d+)(!?)(?:k([hl]?)(\d+))?(!?)|(\d+))')
+# Numbers in an expression are at most this many digits, so that parsing
+# and the totals stay far below the 4300 digit limit of int() and str()
+_maxDigits: int = 1000
+
+# Terms with at least this many dice are rolled with NumPy when available
+_batchSize: int = 64
+
+
+class DiceTerm(NamedTuple):
+    sign: int
+    # Number of dice, or the value of a constant term
+    count: int
+    # Faces per die, 0 for a constant term
+    sides: int
+    # Dice kept after the roll, 0 keeps every die
+    keep: int
+    highest: bool
+    explode: bool
+
+    @property
+    def text(self) -> str:
+        if not self.sides:
+            return str(self.count)
+        text: str = f'{self.count}d{self.sides}'
+        if self.keep:
+            text += f'k{"h" if self.highest else "l"}{self.keep}'
+        return text + ('!' if self.explode else '')
+
+
+class DicePlan(NamedTuple):
+    terms: Tuple[DiceTerm, ...]
+    # Total number of dice, before any explode
+    dice: int
+    maxSides: int
+
+    @property
+    def text(self) -> str:
+        text: str = ''.join(('-' if term.sign < 0 else '+') + term.text
+                            for term in self.terms)
+        return text[1:] if text.startswith('+') else text
+
+
+class TermRoll(NamedTuple):
+    term: DiceTerm
+    # Each die in roll order, an exploded die adding up its rerolls
+    values: List[int]
+    # Positions of the dice left out by keep
+    dropped: Tuple[int, ...]
+    subtotal: int
+
+
+class DiceRoll(NamedTuple):
+    total: int
+    terms: Tuple[TermRoll, ...]
+
+
+@lru_cache(maxsize=256)
+def parse(text: str) -> Optional[DicePlan]:
+    '''
+    The plan of a dice expression, None when it is not one
+    '''
+    text = text.lower()
+    if re.fullmatch(expressionPattern, text) is None:
+        return None
+    if any(len(digits) > _maxDigits for digits in re.findall(r'\d+', text)):
+        return None
+    terms: List[DiceTerm] = []
+    for match in _termPattern.finditer(text):
+        sign: int = -1 if match.group(1) == '-' else 1
+        if match.group(8) is not None:
+            terms.append(DiceTerm(sign, int(match.group(8)), 0, 0, True,
+                                  False))
+            continue
+        count: int = int(match.group(2) or '1')
+        sides: int = int(match.group(3))
+        keep: int = int(match.group(6) or '0')
+        explode: bool = '!' in [match.group(4), match.group(7)]
+        if not count or not sides or (match.group(6) and not keep):
+            return None
+        if explode and sides == 1:
+            return None
+        terms.append(DiceTerm(sign, count, sides, keep if keep < count else 0,
+                              match.group(5) != 'l', explode))
+    return DicePlan(tuple(terms),
+                    sum(term.count for term in terms if term.sides),
+                    max(term.sides for term in terms))
+
+
+def roll(plan: DicePlan,
+         rng: random.Random,
+         maxExplosions: int=1000) -> DiceRoll:
+    '''
+    Roll every term of the plan
+
+    At most maxExplosions extra dice are rolled for exploding terms. Large
+    terms are rolled as a NumPy batch seeded from rng, so a seeded rng
+    still replays
+    '''
+    terms: List[TermRoll] = []
+    total: int = 0
+    term: DiceTerm
+    for term in plan.terms:
+        if not term.sides:
+            terms.append(TermRoll(term, [], (), term.sign * term.count))
+        else:
+            termRoll: TermRoll
+            termRoll, maxExplosions = _rollTerm(term, rng, maxExplosions)
+            terms.append(termRoll)
+        total += terms[-1].subtotal
+    return DiceRoll(total, tuple(terms))
+
+
+def _rollTerm(term: DiceTerm,
+              rng: random.Random,
+              maxExplosions: int) -> Tuple[TermRoll, int]:
+    if numpy is not None and term.count >= _batchSize:
+        return _rollBatch(term, rng, maxExplosions)
+    faces: range = range(1, term.sides + 1)
+    values: List[int] = rng.choices(faces, k=term.count)
+    if term.explode:
+        chains: List[int] = [i for i, value in enumerate(values)
+                             if value == term.sides]
+        while chains and maxExplosions:
+            chains = chains[:maxExplosions]
+            maxExplosions -= len(chains)
+            extra: List[int] = rng.choices(faces, k=len(chains))
+            i: int
+            value: int
+            for i, value in zip(chains, extra):
+                values[i] += value
+            chains = [i for i, value in zip(chains, extra)
+                      if value == term.sides]
+    dropped: Tuple[int, ...] = ()
+    if term.keep:
+        order: List[int] = sorted(range(len(values)), key=values.__getitem__,
+                                  reverse=term.highest)
+        dropped = tuple(sorted(order[term.keep:]))
+    subtotal: int = sum(values) - sum(values[i] for i in dropped)
+    return (TermRoll(term, values, dropped, term.sign * subtotal),
+            maxExplosions)
+
+
+def _rollBatch(term: DiceTerm,
+               rng: random.Random,
+               maxExplosions: int) -> Tuple[TermRoll, int]:
+    generator: Any = numpy.random.default_rng(rng.getrandbits(64))
+    values: Any = generator.integers(1, term.sides, size=term.count,
+                                     endpoint=True, dtype=numpy.int64)
+    if term.explode:
+        chains: Any = numpy.flatnonzero(values == term.sides)
+        while chains.size and maxExplosions:
+            chains = chains[:maxExplosions]
+            maxExplosions -= chains.size
+            extra: Any = generator.integers(1, term.sides, size=chains.size,
+                                            endpoint=True, dtype=numpy.int64)
+            values[chains] += extra
+            chains = chains[extra == term.sides]
+    dropped: Tuple[int, ...] = ()
+    subtotal: int
+    if term.keep:
+        order: Any = numpy.argsort(-values if term.highest else values,
+                                   kind='stable')
+        droppedIndexes: Any = numpy.sort(order[term.keep:])
+        dropped = tuple(droppedIndexes.tolist())
+        subtotal = int(values[order[:term.keep]].sum())
+    else:
+        subtotal = int(values.sum())
+    return (TermRoll(term, values.tolist(), dropped, term.sign * subtotal),
+            maxExplosions)
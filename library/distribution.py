@@ -0,0 +1,315 @@
+﻿import bisect
+import math
+from functools import lru_cache
+from itertools import accumulate
+from typing import Any, List, NamedTuple, Optional, Sequence  # noqa: F401
+
+from .dice import DicePlan, DiceTerm
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Exploding dice are followed until a chain this unlikely
+_explodeCutoff: float = 1e-15
+# Shorter distributions are convolved directly instead of through the FFT
+_fftLength: int = 64
+# Cost of a pure Python arithmetic operation and of a NumPy call, in NumPy
+# element operations
+_pythonOperation: float = 50.0
+_vectorOverhead: float = 200.0
+
+
+class Distribution(NamedTuple):
+    # Smallest outcome; probabilities[i] is the chance of offset + i
+    offset: int
+    probabilities: Sequence[float]
+    # cumulative[i] is the chance of at most offset + i
+    cumulative: Sequence[float]
+    mean: float
+    deviation: float
+
+    @property
+    def minimum(self) -> int:
+        return self.offset
+
+    @property
+    def maximum(self) -> int:
+        return self.offset + len(self.probabilities) - 1
+
+    def percentile(self, fraction: float) -> int:
+        '''
+        The smallest outcome with at least fraction of the outcomes at or
+        below it
+        '''
+        index: int = bisect.bisect_left(self.cumulative, fraction - 1e-12)
+        return self.offset + min(index, len(self.probabilities) - 1)
+
+    def atMost(self, value: int) -> float:
+        index: int = value - self.offset
+        if index < 0:
+            return 0.0
+        if index >= len(self.cumulative):
+            return 1.0
+        return min(float(self.cumulative[index]), 1.0)
+
+    def between(self, low: int, high: int) -> float:
+        '''
+        The chance of an outcome from low to high inclusive
+        '''
+        if low > high:
+            return 0.0
+        return max(self.atMost(high) - self.atMost(low - 1), 0.0)
+
+    def rank(self, value: int) -> float:
+        '''
+        The fraction of outcomes below value, counting ties as half
+        '''
+        return self.atMost(value - 1) + self.between(value, value) / 2
+
+
+def _create(offset: int, probabilities: Any) -> Distribution:
+    # The first and last outcomes must be possible ones: convolution
+    # rounding can leave noise outside of the support, but not inside it
+    if numpy is not None:
+        probabilities = numpy.asarray(probabilities, dtype=float)
+        probabilities /= probabilities.sum()
+        values: Any = numpy.arange(len(probabilities), dtype=float)
+        mean: float = float(probabilities @ values)
+        variance: float = float(probabilities @ (values - mean) ** 2)
+        return Distribution(offset, probabilities,
+                            numpy.cumsum(probabilities), offset + mean,
+                            math.sqrt(variance))
+    total: float = sum(probabilities)
+    probabilities = [p / total for p in probabilities]
+    mean = sum(i * p for i, p in enumerate(probabilities))
+    variance = sum((i - mean) ** 2 * p for i, p in enumerate(probabilities))
+    return Distribution(offset, probabilities, list(accumulate(probabilities)),
+                        offset + mean, math.sqrt(variance))
+
+
+def _explodeDepth(sides: int) -> int:
+    return max(math.ceil(-math.log(_explodeCutoff) / math.log(sides)), 1)
+
+
+def _dieProbabilities(sides: int, explode: bool) -> List[float]:
+    '''
+    The chance of each outcome of one die, starting from 0
+    '''
+    if not explode:
+        return [0.0] + [1 / sides] * sides
+    depth: int = _explodeDepth(sides)
+    probabilities: List[float] = [0.0]
+    chain: int
+    for chain in range(depth):
+        chance: float = sides ** -(chain + 1)
+        probabilities += [chance] * (sides - 1) + [0.0]
+    # The last chain stops exploding
+    probabilities[-1] = sides ** -depth
+    return probabilities
+
+
+def _convolve(first: Any, second: Any) -> Any:
+    if numpy is not None:
+        if min(len(first), len(second)) < _fftLength:
+            return numpy.convolve(first, second)
+        length: int = len(first) + len(second) - 1
+        size: int = 1 << (length - 1).bit_length()
+        result: Any = numpy.fft.irfft(numpy.fft.rfft(first, size)
+                                      * numpy.fft.rfft(second, size), size)
+        return numpy.clip(result[:length], 0.0, None)
+    result = [0.0] * (len(first) + len(second) - 1)
+    i: int
+    p: float
+    for i, p in enumerate(first):
+        if p:
+            j: int
+            q: float
+            for j, q in enumerate(second, i):
+                result[j] += p * q
+    return result
+
+
+def _power(probabilities: List[float], count: int) -> Any:
+    '''
+    The distribution of the sum of count independent draws
+    '''
+    if numpy is not None:
+        length: int = count * (len(probabilities) - 1) + 1
+        size: int = 1 << (length - 1).bit_length()
+        result: Any = numpy.fft.irfft(
+            numpy.fft.rfft(probabilities, size) ** count, size)
+        return numpy.clip(result[:length], 0.0, None)
+    if probabilities[0] == 0 and len(set(probabilities[1:])) == 1:
+        return _uniformPower(len(probabilities) - 1, count)
+    total: List[float] = [1.0]
+    for _ in range(count):
+        total = _convolve(total, probabilities)
+    return total
+
+
+def _uniformPower(sides: int, count: int) -> List[float]:
+    # Each die adds a sliding window sum over the previous distribution
+    total: List[float] = [1.0]
+    for _ in range(count):
+        prefix: List[float] = [0.0, *accumulate(total)]
+        length: int = len(total) + sides
+        total = [(prefix[min(i, len(total))] - prefix[max(i - sides, 0)])
+                 / sides for i in range(length)]
+    return total
+
+
+def _binomial(trials: int, chance: float, limit: int) -> List[float]:
+    '''
+    The chance of exactly 0 to limit - 1 successes in trials trials
+    '''
+    pmf: List[float] = [(1 - chance) ** trials]
+    ratio: float = chance / (1 - chance)
+    successes: int
+    for successes in range(min(limit, trials + 1) - 1):
+        pmf.append(pmf[-1] * (trials - successes) / (successes + 1) * ratio)
+    return pmf
+
+
+def _zeros(length: int) -> Any:
+    if numpy is not None:
+        return numpy.zeros(length)
+    return [0.0] * length
+
+
+def _addShifted(target: Any, source: Any, shift: int, weight: float) -> None:
+    if numpy is not None:
+        target[shift:] += weight * source[:len(source) - shift]
+        return
+    i: int
+    p: float
+    for i, p in enumerate(source[:len(source) - shift]):
+        if p:
+            target[i + shift] += weight * p
+
+
+def _keepHighest(count: int, sides: int, keep: int) -> Any:
+    '''
+    The distribution of the sum of the keep highest of count dice
+
+    Faces are placed from the highest down: every die not yet placed shows
+    the current face with a chance of 1 / face. placed[i] holds the kept
+    sum while i dice are placed; once keep dice are placed the sum is done
+    '''
+    length: int = keep * sides + 1
+    placed: List[Any] = [_zeros(length) for _ in range(keep + 1)]
+    placed[0][0] = 1.0
+    face: int
+    for face in range(sides, 0, -1):
+        nextPlaced: List[Any] = [_zeros(length) for _ in range(keep)]
+        nextPlaced.append(placed[keep])
+        i: int
+        for i in range(keep):
+            if not any(placed[i]) if numpy is None else not placed[i].any():
+                continue
+            remaining: int = count - i
+            needed: int = keep - i
+            pmf: List[float] = []
+            if face > 1:
+                pmf = _binomial(remaining, 1 / face, needed)
+            c: int
+            chance: float
+            for c, chance in enumerate(pmf):
+                _addShifted(nextPlaced[i + c], placed[i], face * c, chance)
+            _addShifted(nextPlaced[keep], placed[i], face * needed,
+                        max(1.0 - sum(pmf), 0.0))
+        placed = nextPlaced
+    return placed[keep]
+
+
+def _operationScale() -> float:
+    return 1.0 if numpy is not None else _pythonOperation
+
+
+def _termDistribution(term: DiceTerm) -> Distribution:
+    if not term.sides:
+        return _create(term.sign * term.count, [1.0])
+    # Every die shows at least 1
+    offset: int
+    probabilities: Any
+    if term.keep:
+        offset = term.keep
+        probabilities = _keepHighest(term.count, term.sides,
+                                     term.keep)[offset:]
+        if not term.highest:
+            # Mirroring the faces turns the lowest dice into the highest
+            probabilities = probabilities[::-1]
+    else:
+        offset = term.count
+        probabilities = _power(_dieProbabilities(term.sides, term.explode),
+                               term.count)[offset:]
+    if term.sign < 0:
+        probabilities = probabilities[::-1]
+        offset = -(offset + len(probabilities) - 1)
+    return _create(offset, probabilities)
+
+
+def supported(plan: DicePlan) -> bool:
+    '''
+    Whether the plan's exact distribution can be computed: dice that both
+    keep and explode are not
+    '''
+    return not any(term.keep and term.explode for term in plan.terms)
+
+
+def workload(plan: DicePlan) -> float:
+    '''
+    Rough cost of distribution() in NumPy element operations, a pure
+    Python operation counting as _pythonOperation of those
+    '''
+    operations: float = 0.0
+    length: int = 1
+    term: DiceTerm
+    for term in plan.terms:
+        if not term.sides:
+            continue
+        if term.keep:
+            termLength: int = term.keep * term.sides + 1
+            # One vector operation per face, placed dice and count shown
+            operations += term.sides * term.keep ** 2 * (
+                termLength * _operationScale() + _vectorOverhead)
+        else:
+            dieLength: int = term.sides + 1
+            if term.explode:
+                dieLength = term.sides * _explodeDepth(term.sides) + 1
+            termLength = term.count * (dieLength - 1) + 1
+            if numpy is not None:
+                operations += termLength * math.log2(termLength + 1)
+            elif term.explode:
+                operations += (term.count * termLength * dieLength / 2
+                               * _pythonOperation)
+            else:
+                operations += term.count * termLength * _pythonOperation
+        if numpy is not None:
+            operations += (length + termLength) * math.log2(
+                length + termLength)
+        else:
+            operations += length * termLength * _pythonOperation
+        length += termLength - 1
+    return operations
+
+
+@lru_cache(maxsize=64)
+def distribution(plan: DicePlan) -> Optional[Distribution]:
+    '''
+    The exact distribution of the plan's total, None when not supported()
+
+    Sums of dice are computed with FFT convolution when NumPy is available
+    '''
+    if not supported(plan):
+        return None
+    offset: int = 0
+    probabilities: Any = [1.0]
+    term: DiceTerm
+    for term in plan.terms:
+        termDistribution: Distribution = _termDistribution(term)
+        offset += termDistribution.offset
+        probabilities = _convolve(probabilities,
+                                  termDistribution.probabilities)
+    return _create(offset, probabilities)
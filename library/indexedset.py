@@ -0,0 +1,71 @@
+﻿import random
+from collections.abc import Set
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional
+
+
+class IndexedSet(Set):
+    '''
+    Set with O(1) add, discard and uniform random choice
+
+    Members are kept in a list with a reverse position index. Removal swaps
+    the last member into the freed slot, so the list never has holes.
+    '''
+    __slots__ = ('_items', '_positions')
+
+    def __init__(self, iterable: Optional[Iterable[Hashable]]=None) -> None:
+        self._items: List[Hashable] = []
+        if iterable is not None:
+            self._items = list(dict.fromkeys(iterable))
+        self._positions: Dict[Hashable, int] = {
+            item: position for position, item in enumerate(self._items)}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, item: object) -> bool:
+        return item in self._positions
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._items)
+
+    def __getitem__(self, index: int) -> Hashable:
+        return self._items[index]
+
+    def add(self, item: Hashable) -> None:
+        if item not in self._positions:
+            self._positions[item] = len(self._items)
+            self._items.append(item)
+
+    def discard(self, item: Hashable) -> None:
+        position: Optional[int] = self._positions.pop(item, None)
+        if position is None:
+            return
+        last: Hashable = self._items.pop()
+        if position < len(self._items):
+            self._items[position] = last
+            self._positions[last] = position
+
+    def choice(self, rng: Optional[random.Random]=None) -> Hashable:
+        if not self._items:
+            raise IndexError('Cannot choose from an empty set')
+        randrange = random.randrange if rng is None else rng.randrange
+        return self._items[randrange(len(self._items))]
+
+    def sample(self, k: int,
+               rng: Optional[random.Random]=None) -> List[Hashable]:
+        '''
+        k distinct members in random order, O(k) using Floyd's algorithm
+        '''
+        n: int = len(self._items)
+        if not 0 <= k <= n:
+            raise ValueError('Sample larger than population or is negative')
+        randrange = random.randrange if rng is None else rng.randrange
+        chosen: Dict[int, None] = {}
+        j: int
+        for j in range(n - k, n):
+            t: int = randrange(j + 1)
+            chosen[j if t in chosen else t] = None
+        indexes: List[int] = list(chosen)
+        shuffle = random.shuffle if rng is None else rng.shuffle
+        shuffle(indexes)
+        return [self._items[i] for i in indexes]
@@ -0,0 +1,90 @@
+﻿import bisect
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional  # noqa: F401
+
+# Upper bounds of the latency histogram buckets: from 1ms, a quarter octave
+# apart, up to about two minutes. Longer events land in one last bucket
+_bucketBounds: List[float] = [0.001 * 2 ** (i / 4) for i in range(69)]
+
+
+class Timings:
+    '''
+    Count, total and longest duration of the events under each label
+    '''
+    __slots__ = ('_entries',)
+
+    def __init__(self) -> None:
+        # label -> [count, total seconds, longest seconds]
+        self._entries: Dict[str, List[float]] = {}
+
+    def record(self, label: str, seconds: float) -> None:
+        entry: List[float] = self._entries.setdefault(label, [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+        if seconds > entry[2]:
+            entry[2] = seconds
+
+    @contextmanager
+    def time(self, label: str) -> Iterator[None]:
+        start: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(label, time.perf_counter() - start)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {label: {'count': count, 'seconds': total, 'longest': longest}
+                for label, (count, total, longest) in self._entries.items()}
+
+    def reset(self) -> None:
+        self._entries.clear()
+
+
+class Histograms:
+    '''
+    Latency histogram of the events under each label
+    '''
+    __slots__ = ('_counts',)
+
+    def __init__(self) -> None:
+        # label -> events per bucket of _bucketBounds, then the overflow
+        self._counts: Dict[str, List[int]] = {}
+
+    def record(self, label: str, seconds: float) -> None:
+        if label not in self._counts:
+            self._counts[label] = [0] * (len(_bucketBounds) + 1)
+        self._counts[label][bisect.bisect_left(_bucketBounds, seconds)] += 1
+
+    def count(self, label: str) -> int:
+        return sum(self._counts.get(label, ()))
+
+    def percentile(self, label: str, fraction: float) -> Optional[float]:
+        '''
+        Upper bound of the bucket holding the fraction of the events, None
+        without events
+        '''
+        counts: Optional[List[int]] = self._counts.get(label)
+        if not counts:
+            return None
+        rank: float = fraction * sum(counts)
+        seen: int = 0
+        index: int
+        count: int
+        for index, count in enumerate(counts):
+            seen += count
+            if count and seen >= rank:
+                break
+        if index == len(_bucketBounds):
+            return float('inf')
+        return _bucketBounds[index]
+
+    def stats(self) -> Dict[str, Dict[str, Optional[float]]]:
+        return {label: {'count': self.count(label),
+                        'p50': self.percentile(label, 0.5),
+                        'p90': self.percentile(label, 0.9),
+                        'p99': self.percentile(label, 0.99)}
+                for label in self._counts}
+
+    def reset(self) -> None:
+        self._counts.clear()
@@ -1,7 +1,37 @@
-﻿from typing import Any, SupportsInt, Union
+﻿import math
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Iterable, List, Optional, SupportsInt, Tuple, Union  # noqa: F401,E501
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 Base = Union[int, str]
 
+digitAlphabet: str = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+# Bases that format() renders directly
+_formatSpecs: Dict[int, str] = {2: 'b', 8: 'o', 16: 'X'}
+# Largest number of digits converted per chunk table lookup
+_chunkLimit: int = 4096
+# Values below this many bits are converted without splitting
+_splitBits: int = 2048
+# Values up to this many bits, or strings up to this many digits, use the
+# plain digit by digit conversion
+_smallBits: int = 64
+_smallDigits: int = 16
+# Values below 2 ** _arrayBits in magnitude are converted by the NumPy
+# paths of to_base_many and from_base_many
+_arrayBits: int = 62
+# Marks characters that are not digits in the array digit tables
+_notDigit: int = 99
+# Digit value of every upper and lower case digit character
+_digitValues: Dict[str, int] = {
+    **{char: value for value, char in enumerate(digitAlphabet)},
+    **{char.lower(): value for value, char in enumerate(digitAlphabet)},
+    }
+
 
 def digit_to_char(digit: int) -> str:
     if digit < 10:
@@ -10,345 +40,816 @@ def digit_to_char(digit: int) -> str:
 
 
 def char_to_digit(char: str) -> int:
-    if '0' <= char <= '9':
-        return ord(char) - ord('0')
-    if 'A' <= char.upper() <= 'Z':
-        return ord(char.upper()) - ord('A') + 10
-    raise ValueError(f'Invalid char: {char}')
+    digit: Optional[int] = _digitValues.get(char)
+    if digit is None:
+        raise ValueError(f'Invalid char: {char}')
+    return digit
+
+
+class Codec(ABC):
+    '''
+    Conversion between ints and digit strings for one base
+    '''
+    base: Base
+    # Multiplier between digit positions, for the array conversions
+    radix: int
+    # Digits indexed by the remainders of arrayStep, None when the codec
+    # has no array conversion
+    arrayAlphabet: Optional[str] = None
+    # Whether negative values are written as - followed by the digits of
+    # the magnitude
+    signed: bool = False
+    digitValues: Dict[str, int]
+
+    def accepts(self, value: int) -> bool:
+        return True
+
+    def arrayStep(self, values: Any) -> Optional[Tuple[Any, Any]]:
+        '''
+        Split an int64 array into the values left after the lowest digits
+        and the alphabet indexes of those digits, None when the codec has
+        no array conversion
+        '''
+        return None
+
+    @abstractmethod
+    def encode(self, value: int) -> str:
+        pass
+
+    @abstractmethod
+    def decode(self, digits: str) -> int:
+        pass
+
+
+class PositiveBaseCodec(Codec):
+    '''
+    Bases 2 to 36, with a leading - for negative values
+
+    Large values are split in half on precomputed powers of the base so
+    that the work is spent on a few large divisions and multiplications
+    instead of one small step per digit
+    '''
+    signed = True
+
+    def __init__(self, base: int) -> None:
+        self.base: int = base
+        self.radix: int = base
+        self.alphabet: str = digitAlphabet[:base]
+        self.arrayAlphabet: Optional[str] = self.alphabet
+        self.digitValues: Dict[str, int] = {
+            char: value for char, value in _digitValues.items()
+            if value < base}
+        self.deleteTable: Dict[int, None] = str.maketrans(
+            '', '', ''.join(self.digitValues))
+        self.formatSpec: Optional[str] = _formatSpecs.get(base)
+        self.leafDigits: int = max(_splitBits // 2 // base.bit_length(), 1)
+        # base ** (leafDigits * 2 ** i) for i in 0, 1, ...
+        self.powers: List[int] = [base ** self.leafDigits]
+        chunkDigits: int = 1
+        while base ** (chunkDigits + 1) <= _chunkLimit:
+            chunkDigits += 1
+        self.chunk: int = base ** chunkDigits
+        self._chunkStrs: Optional[List[str]] = None
+
+    def chunkStrs(self) -> List[str]:
+        '''
+        Every value below self.chunk as zero padded digits, built on first
+        use
+        '''
+        if self._chunkStrs is None:
+            strs: List[str] = ['']
+            while len(strs) < self.chunk:
+                strs = [prefix + digit for prefix in strs
+                        for digit in self.alphabet]
+            self._chunkStrs = strs
+        return self._chunkStrs
+
+    def powerTable(self, level: int) -> List[int]:
+        powers: List[int] = self.powers
+        while len(powers) <= level:
+            powers.append(powers[-1] * powers[-1])
+        return powers
+
+    def arrayStep(self, values: Any) -> Tuple[Any, Any]:
+        return numpy.divmod(values, self.base)
+
+    def encode(self, value: int) -> str:
+        if value < 0:
+            return '-' + self.digits(-value)
+        return self.digits(value)
+
+    def digits(self, value: int, width: int=0) -> str:
+        '''
+        Digits of a non-negative value, zero padded to width
+        '''
+        if value < self.base:
+            return self.alphabet[value].rjust(width, '0')
+        if self.formatSpec is not None:
+            return format(value, self.formatSpec).rjust(width, '0')
+        bits: int = value.bit_length()
+        if bits < _splitBits:
+            return self._leafStr(value, width)
+        top: int = 0
+        while self.powerTable(top)[top].bit_length() * 2 <= bits + 1:
+            top += 1
+        parts: List[str] = []
+        self._splitStr(value, top, width, parts)
+        return ''.join(parts)
+
+    def _leafStr(self, value: int, width: int) -> str:
+        chunk: int = self.chunk
+        strs: List[str] = self.chunkStrs()
+        parts: List[str] = []
+        remainder: int
+        while value:
+            value, remainder = divmod(value, chunk)
+            parts.append(strs[remainder])
+        parts.reverse()
+        digits: str = ''.join(parts).lstrip('0')
+        return digits.rjust(width, '0') if width else digits or '0'
+
+    def _splitStr(self,
+                  value: int,
+                  level: int,
+                  width: int,
+                  parts: List[str]) -> None:
+        if level < 0:
+            parts.append(self._leafStr(value, width))
+            return
+        high: int
+        low: int
+        high, low = divmod(value, self.powers[level])
+        lowWidth: int = self.leafDigits << level
+        highWidth: int = max(width - lowWidth, 0)
+        if high or highWidth:
+            self._splitStr(high, level - 1, highWidth, parts)
+            self._splitStr(low, level - 1, lowWidth, parts)
+        else:
+            self._splitStr(low, level - 1, width, parts)
+
+    def decode(self, digits: str) -> int:
+        sign: int = 1
+        if digits[:1] in ['-', '+']:
+            sign = -1 if digits[0] == '-' else 1
+            digits = digits[1:]
+        if not digits:
+            raise ValueError('value is invalid')
+        invalid: str = digits.translate(self.deleteTable)
+        if invalid:
+            raise ValueError(
+                f'invalid literal for base {self.base}: {invalid[-1]}')
+        return sign * self.value(digits)
+
+    def value(self, digits: str) -> int:
+        '''
+        Value of already validated digits
+        '''
+        if (self.base & (self.base - 1) == 0
+                or len(digits) <= self.leafDigits):
+            return int(digits, self.base)
+        level: int = 0
+        while self.leafDigits << (level + 1) < len(digits):
+            level += 1
+        self.powerTable(level)
+        return self._splitValue(digits, level)
+
+    def _splitValue(self, digits: str, level: int) -> int:
+        if level < 0:
+            return int(digits, self.base)
+        lowWidth: int = self.leafDigits << level
+        if len(digits) <= lowWidth:
+            return self._splitValue(digits, level - 1)
+        return (self._splitValue(digits[:-lowWidth], level - 1)
+                * self.powers[level]
+                + self._splitValue(digits[-lowWidth:], level - 1))
+
+
+class NegativeBaseCodec(Codec):
+    '''
+    Bases -36 to -2
+
+    With n digits, adding M = sum((b - 1) * b ** i for odd i < n) to a value
+    maps it onto an n digit number in base b = -base whose digits at odd
+    positions are flipped (d -> b - 1 - d)
+    '''
+    def __init__(self, base: int, positive: PositiveBaseCodec) -> None:
+        self.base: int = base
+        self.radix: int = base
+        self.positive: PositiveBaseCodec = positive
+        alphabet: str = positive.alphabet
+        self.arrayAlphabet: Optional[str] = alphabet
+        self.digitValues: Dict[str, int] = positive.digitValues
+        self.flipTable: Dict[int, str] = str.maketrans(
+            alphabet + alphabet.lower(), alphabet[::-1] * 2)
+
+    def arrayStep(self, values: Any) -> Tuple[Any, Any]:
+        quotient: Any
+        remainder: Any
+        quotient, remainder = numpy.divmod(values, self.base)
+        borrow: Any = remainder < 0
+        return quotient + borrow, remainder - self.base * borrow
+
+    def offset(self, size: int) -> int:
+        magnitude: int = -self.base
+        return ((magnitude - 1) * magnitude
+                * (magnitude ** (size // 2 * 2) - 1)
+                // (magnitude * magnitude - 1))
+
+    def flip(self, digits: str) -> str:
+        odd: int = len(digits) % 2
+        chars: List[str] = list(digits)
+        chars[odd::2] = digits[odd::2].translate(self.flipTable)
+        return ''.join(chars)
+
+    def encode(self, value: int) -> str:
+        if not value:
+            return '0'
+        base: int = self.base
+        if value.bit_length() <= _smallBits:
+            digits: List[str] = []
+            while value != 0:
+                remainder: int
+                value, remainder = divmod(value, base)
+                if remainder < 0:
+                    value, remainder = value + 1, remainder - base
+                digits.append(digitAlphabet[remainder])
+            digits.reverse()
+            return ''.join(digits)
+        magnitude: int = -base
+        size: int = _digitCount(value, magnitude) + 1
+        while True:
+            offset: int = self.offset(size)
+            if -offset <= value <= magnitude ** size - 1 - offset:
+                break
+            size += 1
+        positive: str = self.positive.digits(value + offset, size)
+        return self.flip(positive).lstrip('0') or '0'
+
+    def decode(self, digits: str) -> int:
+        if not digits:
+            raise ValueError('value is invalid')
+        if len(digits) <= _smallDigits:
+            digitValues: Dict[str, int] = self.positive.digitValues
+            num: int = 0
+            char: str
+            for char in digits:
+                bit: Optional[int] = digitValues.get(char)
+                if bit is None:
+                    raise ValueError(f'''\
+invalid literal for negative base {self.base}: {char}''')
+                num = num * self.base + bit
+            return num
+        invalid: str = digits.translate(self.positive.deleteTable)
+        if invalid:
+            raise ValueError(
+                f'invalid literal for negative base {self.base}: '
+                f'{invalid[-1]}')
+        return (self.positive.value(self.flip(digits))
+                - self.offset(len(digits)))
+
+
+class BalancedTernaryCodec(Codec):
+    '''
+    Balanced ternary with the digits T (-1), 0 and 1
+
+    Adding (3 ** n - 1) // 2 to a value maps it onto an n digit base 3
+    number whose digits are shifted up by one
+    '''
+    digitValues: Dict[str, int] = {'T': -1, 't': -1, '0': 0, '1': 1}
+    encodeTable: Dict[int, str] = str.maketrans('012', 'T01')
+    decodeTable: Dict[int, str] = str.maketrans('Tt01', '0012')
+    deleteTable: Dict[int, None] = str.maketrans('', '', 'Tt01')
+    radix = 3
+    arrayAlphabet = '01T'
+
+    def __init__(self, ternary: PositiveBaseCodec) -> None:
+        self.base: str = 't'
+        self.ternary: PositiveBaseCodec = ternary
+
+    def arrayStep(self, values: Any) -> Tuple[Any, Any]:
+        remainder: Any = values % 3
+        return (values + (remainder == 2)) // 3, remainder
+
+    def encode(self, value: int) -> str:
+        if not value:
+            return '0'
+        if value.bit_length() <= _smallBits:
+            digits: List[str] = []
+            while value != 0:
+                remainder: int = value % 3
+                if remainder == 2:
+                    digits.append('T')
+                    value += 1
+                else:
+                    digits.append(digitAlphabet[remainder])
+                value //= 3
+            digits.reverse()
+            return ''.join(digits)
+        size: int = _digitCount(value, 3) + 1
+        while 3 ** size // 2 < abs(value):
+            size += 1
+        positive: str = self.ternary.digits(value + 3 ** size // 2, size)
+        return positive.translate(self.encodeTable).lstrip('0') or '0'
+
+    def decode(self, digits: str) -> int:
+        if not digits:
+            raise ValueError('value is invalid')
+        if len(digits) <= _smallDigits:
+            num: int = 0
+            char: str
+            for char in digits:
+                bit: Optional[int] = self.digitValues.get(char)
+                if bit is None:
+                    raise ValueError(
+                        'invalid literal for balanced ternary base')
+                num = num * 3 + bit
+            return num
+        if digits.translate(self.deleteTable):
+            raise ValueError('invalid literal for balanced ternary base')
+        return (self.ternary.value(digits.translate(self.decodeTable))
+                - 3 ** len(digits) // 2)
+
+
+class FactorialBaseCodec(Codec):
+    '''
+    Factorial base, non-negative values with at most 35 digits
+    '''
+    def __init__(self) -> None:
+        self.base: str = '!'
+
+    def accepts(self, value: int) -> bool:
+        return value >= 0
+
+    def encode(self, value: int) -> str:
+        if value < 0:
+            raise ValueError('factorial base does not have negative numbers')
+        if not value:
+            return '0'
+        digits: List[str] = []
+        base: int = 1
+        while value != 0:
+            remainder: int
+            value, remainder = divmod(value, base)
+            digits.append(digitAlphabet[remainder])
+            base += 1
+            if base >= 36:
+                raise ValueError(
+                    'Value too large to represent in factorial base')
+        digits.reverse()
+        return ''.join(digits)
+
+    def decode(self, digits: str) -> int:
+        if not digits:
+            raise ValueError('value is invalid')
+        if len(digits) >= 36:
+            raise ValueError(f'''\
+not enough digits to represent values of this size: {digits}''')
+        num: int = 0
+        power: int = 1
+        i: int
+        char: str
+        for i, char in enumerate(reversed(digits)):
+            bit: Optional[int] = _digitValues.get(char)
+            if bit is None or bit > i:
+                raise ValueError(
+                    f'invalid literal for factorial base: {char}')
+            num += bit * power
+            power *= i + 1
+        return num
+
+
+def _digitCount(value: int, base: int) -> int:
+    '''
+    An upper bound of the number of digits of abs(value) in base
+    '''
+    return int(abs(value).bit_length() / math.log2(base)) + 2
+
+
+def _buildCodecs() -> Dict[Base, Codec]:
+    positives: Dict[int, PositiveBaseCodec] = {
+        base: PositiveBaseCodec(base) for base in range(2, 37)}
+    registry: Dict[Base, Codec] = {}
+    registry.update(positives)
+    registry.update({-base: NegativeBaseCodec(-base, positive)
+                     for base, positive in positives.items()})
+    registry['t'] = BalancedTernaryCodec(positives[3])
+    registry['!'] = FactorialBaseCodec()
+    return registry
+
+
+codecs: Dict[Base, Codec] = _buildCodecs()
+
+
+def codec(base: Base) -> Codec:
+    if isinstance(base, str):
+        base = base.lower()
+    numberCodec: Optional[Codec] = codecs.get(base)
+    if numberCodec is None:
+        raise ValueError(f'Invalid base: {base}')
+    return numberCodec
 
 
 def positiveBaseStr(number: int, base: int) -> str:
-    if number < 0:
-        return f'-{positiveBaseStr(-number, base)}'
-    d: int
-    m: int
-    d, m = divmod(number, base)
-    if d > 0:
-        return positiveBaseStr(d, base) + digit_to_char(m)
-    return digit_to_char(m)
+    if not 2 <= base <= 36:
+        raise ValueError(f'Invalid base: {base}')
+    return codecs[base].encode(number)
 
 
 def negativeBaseStr(i: int, base: int) -> str:
-    digits: str = ''
-    if not i:
-        digits = '0'
-    else:
-        while i != 0:
-            remainder: int
-            i, remainder = divmod(i, base)
-            if remainder < 0:
-                i, remainder = i + 1, remainder - base
-            digits = digit_to_char(remainder) + digits
-    return digits
+    if not -36 <= base <= -2:
+        raise ValueError(f'Invalid base: {base}')
+    return codecs[base].encode(i)
 
 
 def negativeBaseInt(s: str, base: int) -> int:
-    num: int = 0
-    power: int = 1
-    digit: str
-    for digit in s[::-1]:
-        bit: int = char_to_digit(digit)
-        if bit >= abs(base):
-            raise ValueError(f'''invalid literal for negativeBaseInt() with \
-base {base}: {digit}''')
-        num += bit * power
-        power *= base
-    return num
+    if not -36 <= base <= -2:
+        raise ValueError(f'Invalid base: {base}')
+    return codecs[base].decode(s)
 
 
 def factorialBaseStr(i: int) -> str:
-    if i < 0:
-        raise ValueError('factorial base does not have negative numbers')
-    digits: str = ''
-    base: int = 1
-    if not i:
-        digits = '0'
-    else:
-        while i != 0:
-            remainder: int
-            i, remainder = divmod(i, base)
-            digits = digit_to_char(remainder) + digits
-            base += 1
-            if base >= 36:
-                raise ValueError(
-                    'Value too large to represent in factorial base')
-    return digits
+    return codecs['!'].encode(i)
 
 
 def factorialBaseInt(s: str) -> int:
-    if len(s) >= 36:
-        raise ValueError('not enough digits to represent')
-    num: int = 0
-    power: int = 1
-    digit: str
-    i: int
-    for i, digit in enumerate(reversed(s)):
-        bit: int = char_to_digit(digit)
-        if bit > i:
-            raise ValueError(f'invalid literal for factorialBaseInt(): {bit}')
-        num += bit * power
-        power *= i + 1
-    return num
+    return codecs['!'].decode(s)
 
 
 def balancedBaseStr(i: int) -> str:
-    digits: str = ''
-    if not i:
-        digits = '0'
-    else:
-        while i != 0:
-            remainder: int = i % 3
-            if remainder == 0 or remainder == 1:
-                digits = str(remainder) + digits
-            else:
-                digits = 'T' + digits
-                i += 1
-            i //= 3
-    return digits
+    return codecs['t'].encode(i)
 
 
 def balancedBaseInt(s: str) -> int:
-    num: int = 0
-    power: int = 1
-    digit: str
-    for digit in s[::-1]:
-        bit: int
-        if digit == '0':
-            bit = 0
-        elif digit == '1':
-            bit = 1
-        elif digit == 'T' or digit == 't':
-            bit = -1
-        else:
-            raise ValueError('invalid literal for balancedBaseInt()')
-        num += bit * power
-        power *= 3
-    return num
+    return codecs['t'].decode(s)
+
+
+def paddedStr(value: int, base: Base, width: int=0) -> str:
+    '''
+    Digits of value in base, zero padded to width after any sign
+    '''
+    return _encodePadded(codec(base), value, width)
+
+
+def to_base_many(values: Iterable[int],
+                 base: Base,
+                 width: int=0,
+                 as_bytes: bool=False) -> Any:
+    '''
+    Digit strings of many values in base, with the digits zero padded to
+    width
+
+    Values below 2 ** 62 in magnitude are converted together with NumPy
+    when it is installed, the rest one at a time. Returns a list of str,
+    or with as_bytes a NumPy array of fixed width bytes strings
+    '''
+    numberCodec: Codec = codec(base)
+    if as_bytes and numpy is None:
+        raise ImportError('as_bytes requires numpy')
+    items: Any = values if _isArray(values) else list(values)
+    if numpy is None or numberCodec.arrayAlphabet is None or not len(items):
+        strs: List[str] = [_encodePadded(numberCodec, value, width)
+                           for value in items]
+        return numpy.array(strs, dtype=bytes) if as_bytes else strs
+    array: Any
+    small: Any
+    array, small = _smallArray(items)
+    encoded: Any = _encodeArray(numberCodec, array[small], width)
+    if small.all():
+        return encoded if as_bytes else encoded.astype(str).tolist()
+    strs = [''] * len(small)
+    index: int
+    string: str
+    for index, string in zip(numpy.flatnonzero(small).tolist(),
+                             encoded.astype(str).tolist()):
+        strs[index] = string
+    for index in numpy.flatnonzero(~small).tolist():
+        strs[index] = _encodePadded(numberCodec, int(items[index]), width)
+    return numpy.array(strs, dtype=bytes) if as_bytes else strs
+
+
+def from_base_many(strings: Iterable[Union[str, bytes]],
+                   base: Base) -> List[int]:
+    '''
+    Values of many digit strings in base
+
+    Strings short enough to fit in 62 bits are converted together with
+    NumPy when it is installed, the rest one at a time. Accepts str, or
+    the bytes arrays returned by to_base_many
+    '''
+    numberCodec: Codec = codec(base)
+    items: Any = strings if _isArray(strings) else list(strings)
+    if numpy is None or numberCodec.arrayAlphabet is None or not len(items):
+        return [numberCodec.decode(_asStr(string)) for string in items]
+    array: Any = numpy.ascontiguousarray(items)
+    if array.dtype.kind not in 'SU':
+        raise ValueError('value is invalid')
+    count: int = len(array)
+    lengths: Any = numpy.char.str_len(array)
+    if not _isArray(items):
+        # Trailing NUL characters are dropped by NumPy, so those strings
+        # are left to the scalar conversion to reject
+        lengths[lengths != numpy.fromiter(map(len, items), lengths.dtype,
+                                          count)] = -1
+    codes: Any = array.view(numpy.uint8 if array.dtype.kind == 'S'
+                            else numpy.uint32).reshape(count, -1)
+    table: Any = numpy.full(128, _notDigit, numpy.int8)
+    char: str
+    digit: int
+    for char, digit in numberCodec.digitValues.items():
+        table[ord(char)] = digit
+    # Negative bases need a digit more than their magnitude for some
+    # values, anything too large is caught by the float estimate below
+    maxDigits: int = int(_arrayBits / math.log2(abs(numberCodec.radix))) + 1
+    negative: Any = numpy.zeros(count, bool)
+    start: Any = numpy.zeros(count, numpy.intp)
+    if numberCodec.signed and codes.shape[1]:
+        negative = codes[:, 0] == ord('-')
+        start = (negative | (codes[:, 0] == ord('+'))).astype(numpy.intp)
+    fits: Any = (lengths > start) & (lengths - start <= maxDigits)
+    codes = codes[fits, :maxDigits + 1]
+    negative = negative[fits]
+    start = start[fits]
+    lengths = lengths[fits]
+    invalid: Any = numpy.zeros(len(codes), bool)
+    # int64 arithmetic wraps around, so the result is exact whenever the
+    # estimate shows that the value fits
+    result: Any = numpy.zeros(len(codes), numpy.int64)
+    estimate: Any = numpy.zeros(len(codes), numpy.float64)
+    column: int
+    for column in range(codes.shape[1]):
+        digits: Any = table[numpy.minimum(codes[:, column], 127)]
+        inside: Any = (start <= column) & (column < lengths)
+        invalid |= inside & (digits == _notDigit)
+        result = numpy.where(inside,
+                             result * numberCodec.radix + digits,
+                             result)
+        estimate = numpy.where(inside,
+                               estimate * numberCodec.radix + digits,
+                               estimate)
+    result[negative] = -result[negative]
+    valid: Any = ~invalid & (numpy.abs(estimate) < 2.0 ** _arrayBits)
+    fits[fits] = valid
+    values: List[int] = [0] * count
+    index: int
+    value: int
+    for index, value in zip(numpy.flatnonzero(fits).tolist(),
+                            result[valid].tolist()):
+        values[index] = value
+    for index in numpy.flatnonzero(~fits).tolist():
+        values[index] = numberCodec.decode(_asStr(items[index]))
+    return values
+
+
+def _isArray(values: Any) -> bool:
+    return numpy is not None and isinstance(values, numpy.ndarray)
+
+
+def _asStr(string: Union[str, bytes]) -> str:
+    if isinstance(string, bytes):
+        return string.decode('latin-1')
+    return str(string)
+
+
+def _encodePadded(numberCodec: Codec, value: int, width: int) -> str:
+    digits: str = numberCodec.encode(value)
+    if not width:
+        return digits
+    if digits[:1] == '-':
+        return '-' + digits[1:].rjust(width, '0')
+    return digits.rjust(width, '0')
+
+
+def _smallArray(items: Any) -> Tuple[Any, Any]:
+    '''
+    The items as an int64 array and a mask of the ones that fit in the
+    array conversion, the others are left as 0
+    '''
+    limit: int = 1 << _arrayBits
+    array: Any = numpy.asarray(items)
+    if array.dtype.kind == 'u':
+        small: Any = array < limit
+        return numpy.where(small, array, 0).astype(numpy.int64), small
+    if array.dtype.kind == 'i':
+        small = (array > -limit) & (array < limit)
+        return numpy.where(small, array, 0).astype(numpy.int64), small
+    if array.dtype.kind == 'b':
+        return array.astype(numpy.int64), numpy.ones(len(array), bool)
+    small = numpy.fromiter((isinstance(value, int) and -limit < value < limit
+                            for value in items), bool, len(items))
+    array = numpy.fromiter((value if fits else 0
+                            for value, fits in zip(items, small)),
+                           numpy.int64, len(items))
+    return array, small
+
+
+def _encodeArray(numberCodec: Codec, values: Any, width: int) -> Any:
+    '''
+    Fixed width bytes strings of an int64 array, NUL padded on the right
+    '''
+    count: int = len(values)
+    negative: Any = numpy.zeros(count, numpy.intp)
+    if numberCodec.signed:
+        negative = (values < 0).astype(numpy.intp)
+        values = numpy.abs(values)
+    # Alphabet indexes of the digits, lowest digit first
+    columns: List[Any] = []
+    lengths: Any = numpy.zeros(count, numpy.intp)
+    while True:
+        nonzero: Any = values != 0
+        if not nonzero.any():
+            break
+        lengths += nonzero
+        step: Optional[Tuple[Any, Any]] = numberCodec.arrayStep(values)
+        if step is None:
+            raise ValueError(f'base {numberCodec.base} has no array '
+                             'conversion')
+        digit: Any
+        values, digit = step
+        columns.append(digit.astype(numpy.uint8))
+    lengths = numpy.maximum(lengths, max(width, 1))
+    totals: Any = lengths + negative
+    size: int = int(totals.max()) if count else 1
+    alphabet: Any = numpy.frombuffer(
+        numberCodec.arrayAlphabet.encode('ascii'), numpy.uint8)
+    # Right aligned with the sign, so the last totals[i] characters of a
+    # row are its string
+    digits: Any = numpy.full((count, size), alphabet[0], numpy.uint8)
+    index: int
+    column: Any
+    for index, column in enumerate(columns):
+        digits[:, size - 1 - index] = alphabet[column]
+    signRows: Any = numpy.flatnonzero(negative)
+    digits[signRows, size - totals[signRows]] = ord('-')
+    chars: Any = numpy.zeros((count, size), numpy.uint8)
+    total: int
+    for total in numpy.unique(totals).tolist():
+        rows: Any = totals == total
+        chars[rows, :total] = digits[rows, size - total:]
+    return chars.view(f'S{size}').ravel()
 
 
 class Number:
+    '''
+    Immutable integer value paired with the base it is rendered in
+
+    The string form is rendered on first use and cached
+    '''
+    __slots__ = ('_value', '_base', '_str')
+
     def __init__(self,
                  value: Union[int, str]=0,
                  base: Union[int, str]=10) -> None:
-        self._value: int
-        self._base: Base
+        numberCodec: Codec
+        try:
+            numberCodec = codec(base)
+        except ValueError:
+            raise ValueError('Invalid value or base')
         if isinstance(value, int):
-            valid: bool = False
-            if isinstance(base, int):
-                if -36 <= base <= 36 and not (-2 < base < 2):
-                    valid = True
-            if isinstance(base, str):
-                base = base.lower()
-                if base == '!' and value >= 0:
-                    valid = True
-                if base == 't':
-                    valid = True
-            if valid:
-                self._value = value
-                self._base = base
-                return
-        if isinstance(value, str):
-            if isinstance(base, int):
-                self._base = base
-                if base < 0:
-                    self._value = self.int_negative_base(value, base)
-                    return
-                if base > 0:
-                    self._value = self.int_positive_base(value, base)
-                    return
-            if isinstance(base, str):
-                self._base = base.lower()
-                if self._base == '!':
-                    self._value = self.int_factorial_base(value)
-                    return
-                if self._base == 't':
-                    self._value = self.int_balanced_base(value)
-                    return
-        raise ValueError('Invalid value or base')
+            if not numberCodec.accepts(value):
+                raise ValueError('Invalid value or base')
+        elif isinstance(value, str):
+            value = numberCodec.decode(value)
+        else:
+            raise ValueError('Invalid value or base')
+        _setValue(self, value)
+        _setBase(self, numberCodec.base)
+        _setStr(self, None)
+
+    @classmethod
+    def _trusted(cls, value: int, base: Base) -> 'Number':
+        '''
+        Build a Number without validation, base must be a normalized
+        registry key that accepts the value
+        '''
+        number: Number = _new(cls)
+        _setValue(number, value)
+        _setBase(number, base)
+        _setStr(number, None)
+        return number
+
+    def _derive(self, value: int) -> 'Number':
+        if self._base == '!' and value < 0:
+            raise ValueError('Invalid value or base')
+        return Number._trusted(value, self._base)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError('Number is immutable')
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError('Number is immutable')
+
+    def __reduce__(self) -> Tuple[Any, Tuple[int, Base]]:
+        return Number, (self._value, self._base)
 
     @staticmethod
     def int_positive_base(value: str, base: int) -> int:
-        if not value:
-            raise ValueError('value is invalid')
-        if base > 36 or base < 2:
+        if not 2 <= base <= 36:
             raise ValueError(f'Invalid base: {base}')
-        return int(value, base)
+        return codecs[base].decode(value)
 
     @staticmethod
     def int_negative_base(value: str, base: int) -> int:
-        if not value:
-            raise ValueError('value is invalid')
-        if base < -36 or base > -2:
-            raise ValueError(f'Invalid base: {base}')
-        num: int = 0
-        power: int = 1
-        digit: str
-        for digit in value[::-1]:
-            bit: int = char_to_digit(digit)
-            if bit >= abs(base):
-                raise ValueError(f'''invalid literal for negative base \
-{base}: {digit}''')
-            num += bit * power
-            power *= base
-        return num
+        return negativeBaseInt(value, base)
 
     @staticmethod
     def int_factorial_base(value: str) -> int:
-        if not value:
-            raise ValueError('value is invalid')
-        if len(value) >= 36:
-            raise ValueError(f'''\
-not enough digits to represent values of this size: {value}''')
-        num: int = 0
-        power: int = 1
-        digit: str
-        i: int
-        for i, digit in enumerate(reversed(value)):
-            bit: int = char_to_digit(digit)
-            if bit > i:
-                raise ValueError(
-                    f'invalid literal for factorialBaseInt(): {bit}')
-            num += bit * power
-            power *= i + 1
-        return num
+        return factorialBaseInt(value)
 
     @staticmethod
     def int_balanced_base(value: str) -> int:
-        if not value:
-            raise ValueError('value is invalid')
-        num: int = 0
-        power: int = 1
-        digit: str
-        for digit in value[::-1]:
-            bit: int
-            if digit == '0':
-                bit = 0
-            elif digit == '1':
-                bit = 1
-            elif digit == 'T' or digit == 't':
-                bit = -1
-            else:
-                raise ValueError('invalid literal for balanced ternary base')
-            num += bit * power
-            power *= 3
-        return num
+        return balancedBaseInt(value)
 
     @property
     def base(self) -> Base:
         return self._base
 
     def __str__(self) -> str:
-        if not hasattr(self, '_str'):
-            if isinstance(self._base, int):
-                if self._base < 0:
-                    self._str = self.str_negative_base(self._value, self._base)
-                else:
-                    self._str = self.str_positive_base(self._value, self._base)
-            if self._base == '!':
-                self._str = self.str_factorial_base(self._value)
-            if self._base == 't':
-                self._str = self.str_balanced_base(self._value)
-            if not hasattr(self, '_str'):
-                self._str = super().__str__()
-
+        if self._str is None:
+            _setStr(self, codecs[self._base].encode(self._value))
         return self._str
 
+    def __repr__(self) -> str:
+        return f'Number({self._value!r}, {self._base!r})'
+
     @staticmethod
     def str_positive_base(value: int, base: int) -> str:
-        if base > 36 or base < 2:
-            raise ValueError(f'Invalid base: {base}')
-        digits: str = ''
-        sign: str = ''
-        if value < 0:
-            sign = '-'
-            value = -value
-        if not value:
-            digits = '0'
-        else:
-            value_: int = value
-            while value_ != 0:
-                remainder: int
-                value_, remainder = divmod(value_, base)
-                digits = digit_to_char(remainder) + digits
-        return sign + digits
+        return positiveBaseStr(value, base)
 
     @staticmethod
     def str_negative_base(value: int, base: int) -> str:
-        if base < -36 or base > -2:
-            raise ValueError(f'Invalid base: {base}')
-        digits: str = ''
-        if not value:
-            digits = '0'
-        else:
-            value_: int = value
-            while value_ != 0:
-                remainder: int
-                value_, remainder = divmod(value_, base)
-                if remainder < 0:
-                    value_, remainder = value_ + 1, remainder - base
-                digits = digit_to_char(remainder) + digits
-        return digits
+        return negativeBaseStr(value, base)
 
     @staticmethod
     def str_factorial_base(value: int) -> str:
-        if value < 0:
-            raise ValueError('factorial base does not have negative numbers')
-        digits: str = ''
-        base: int = 1
-        if not value:
-            digits = '0'
-        else:
-            value_: int = value
-            while value_ != 0:
-                remainder: int
-                value_, remainder = divmod(value_, base)
-                digits = digit_to_char(remainder) + digits
-                base += 1
-                if base >= 36:
-                    raise ValueError(
-                        'Value too large to represent in factorial base')
-        return digits
+        return factorialBaseStr(value)
 
     @staticmethod
     def str_balanced_base(value: int) -> str:
-        digits: str = ''
-        if not value:
-            digits = '0'
-        else:
-            value_: int = value
-            while value_ != 0:
-                remainder: int = value_ % 3
-                if remainder == 0 or remainder == 1:
-                    digits = str(remainder) + digits
-                else:
-                    digits = 'T' + digits
-                    value_ += 1
-                value_ //= 3
-        return digits
+        return balancedBaseStr(value)
 
     def __int__(self) -> int:
         return self._value
 
     def as_base(self, base: Base) -> 'Number':
-        return Number(self._value, base)
+        numberCodec: Codec
+        try:
+            numberCodec = codec(base)
+        except ValueError:
+            raise ValueError('Invalid value or base')
+        if not numberCodec.accepts(self._value):
+            raise ValueError('Invalid value or base')
+        return Number._trusted(self._value, numberCodec.base)
 
     def with_value(self, value: int) -> 'Number':
-        return Number(value, self._base)
+        return self._derive(value)
 
     def __add__(self, other: SupportsInt) -> 'Number':
-        return Number(self._value + int(other), self._base)
+        return self._derive(self._value + int(other))
 
     def __sub__(self, other: SupportsInt) -> 'Number':
-        return Number(self._value - int(other), self._base)
+        return self._derive(self._value - int(other))
 
     def __mul__(self, other: SupportsInt) -> 'Number':
-        return Number(self._value * int(other), self._base)
+        return self._derive(self._value * int(other))
 
     def __abs__(self) -> 'Number':
         if self._value < 0:
-            return Number(-self._value, self._base)
+            return self._derive(-self._value)
         else:
             return self
 
+    def __hash__(self) -> int:
+        return hash(self._value)
+
     def __eq__(self, other: Any) -> bool:
+        if isinstance(other, Number):
+            return self._value == other._value
         return self._value == other
+
+    def __lt__(self, other: Any) -> bool:
+        if isinstance(other, Number):
+            return self._value < other._value
+        return self._value < other
+
+    def __le__(self, other: Any) -> bool:
+        if isinstance(other, Number):
+            return self._value <= other._value
+        return self._value <= other
+
+    def __gt__(self, other: Any) -> bool:
+        if isinstance(other, Number):
+            return self._value > other._value
+        return self._value > other
+
+    def __ge__(self, other: Any) -> bool:
+        if isinstance(other, Number):
+            return self._value >= other._value
+        return self._value >= other
+
+
+# Number blocks attribute assignment, so the slots are written through their
+# descriptors
+_new: Callable[[type], Number] = object.__new__
+_setValue: Callable[[Number, int], None] = Number._value.__set__
+_setBase: Callable[[Number, Base], None] = Number._base.__set__
+_setStr: Callable[[Number, Optional[str]], None] = Number._str.__set__
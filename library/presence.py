@@ -0,0 +1,116 @@
+﻿import sys
+from typing import Iterable, List, NamedTuple, Optional, Tuple  # noqa: F401
+
+from .indexedset import IndexedSet
+
+Join: str = 'JOIN'
+Part: str = 'PART'
+Names: str = '353'
+EndOfNames: str = '366'
+
+_commands: Tuple[str, ...] = (Join, Part, Names, EndOfNames)
+# User mode prefixes that NAMES replies may put before a nick
+_modes: str = '~&@%+'
+
+
+class PresenceLine(NamedTuple):
+    command: str
+    channel: str
+    nicks: List[str]
+
+
+def parseLine(line: str) -> Optional[PresenceLine]:
+    '''
+    The command, channel and nicks of a JOIN, PART or NAMES line, None for
+    every other line
+
+    Only the prefix and command are located for the other lines; tags are
+    skipped without being parsed
+    '''
+    start: int = 0
+    if line.startswith('@'):
+        start = line.find(' ') + 1
+        if not start:
+            return None
+    if not line.startswith(':', start):
+        return None
+    prefixEnd: int = line.find(' ', start)
+    commandEnd: int = line.find(' ', prefixEnd + 1)
+    if prefixEnd < 0 or commandEnd < 0:
+        return None
+    command: str = line[prefixEnd + 1:commandEnd]
+    if command not in _commands:
+        return None
+    params: str = line[commandEnd + 1:].rstrip('\r\n')
+    if command in [Join, Part]:
+        nick: str = line[start + 1:prefixEnd].split('!', 1)[0]
+        return PresenceLine(command, params.lstrip(':').lstrip('#'), [nick])
+    head: str
+    trailing: str
+    head, _, trailing = params.partition(' :')
+    # 353 <nick> <type> #<channel> :<nicks>, 366 <nick> #<channel> :<text>
+    channel: str = head.rsplit(' ', 1)[-1].lstrip('#')
+    if command == EndOfNames:
+        return PresenceLine(command, channel, [])
+    return PresenceLine(command, channel,
+                        [nick.lstrip(_modes) for nick in trailing.split()])
+
+
+class ChannelPresence:
+    '''
+    Users in a channel, kept from JOIN, PART and NAMES lines
+
+    The set is ready after its first successful reconciliation, or once
+    trusted as it is. Twitch cuts NAMES down to the operators in rooms of
+    more than about 1000 chatters and leaves out JOIN and PART for most
+    viewers there. While a reconciliation is in flight, joins and parts
+    are journaled and replayed over the fetched list.
+    '''
+    __slots__ = ('users', 'ready', '_journal')
+
+    def __init__(self) -> None:
+        self.users: IndexedSet = IndexedSet()
+        self.ready: bool = False
+        self._journal: Optional[List[Tuple[bool, str]]] = None
+
+    def join(self, nick: str) -> None:
+        self.users.add(sys.intern(nick))
+        if self._journal is not None:
+            self._journal.append((True, nick))
+
+    def part(self, nick: str) -> None:
+        self.users.discard(nick)
+        if self._journal is not None:
+            self._journal.append((False, nick))
+
+    def names(self, nicks: Iterable[str]) -> None:
+        nick: str
+        for nick in nicks:
+            self.join(nick)
+
+    def trust(self) -> None:
+        '''
+        Mark the users from IRC ready without a reconciliation
+        '''
+        self.ready = True
+
+    def beginReconcile(self) -> None:
+        self._journal = []
+
+    def endReconcile(self, users: Optional[Iterable[str]]) -> None:
+        '''
+        Replace the users with the fetched ones, None when the fetch failed
+        '''
+        journal: Optional[List[Tuple[bool, str]]] = self._journal
+        self._journal = None
+        if users is None or journal is None:
+            return
+        self.users = IndexedSet(sys.intern(nick) for nick in users)
+        joined: bool
+        nick: str
+        for joined, nick in journal:
+            if joined:
+                self.users.add(nick)
+            else:
+                self.users.discard(nick)
+        self.ready = True
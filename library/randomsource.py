@@ -0,0 +1,126 @@
+﻿import hashlib
+import os
+import random
+import struct
+from typing import Any, Callable, List, Optional  # noqa: F401
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+_recip53: float = 2.0 ** -53
+
+
+class UrandomRandom(random.Random):
+    '''
+    random.Random drawing from os.urandom through a refill buffer
+
+    Like random.SystemRandom, but one system call serves bufferSize 64 bit
+    words. Cannot be seeded, so it does not replay
+    '''
+    def __init__(self, bufferSize: int=4096) -> None:
+        self.bufferSize: int = bufferSize
+        self._words: List[int] = []
+        super().__init__()
+
+    def seed(self, a: Any=None, version: int=2) -> None:
+        pass
+
+    def getstate(self) -> Any:
+        raise NotImplementedError('UrandomRandom has no state')
+
+    def setstate(self, state: Any) -> None:
+        raise NotImplementedError('UrandomRandom has no state')
+
+    def _word(self) -> int:
+        if not self._words:
+            self._words = list(struct.unpack(
+                f'<{self.bufferSize}Q', os.urandom(8 * self.bufferSize)))
+        return self._words.pop()
+
+    def random(self) -> float:
+        return (self._word() >> 11) * _recip53
+
+    def getrandbits(self, k: int) -> int:
+        return _wordBits(self._word, k)
+
+
+class NumpyRandom(random.Random):
+    '''
+    random.Random drawing from a NumPy Generator in blocks
+
+    Floats and 64 bit words are generated blockSize at a time, so a draw
+    is a list pop instead of a call into NumPy
+    '''
+    def __init__(self, a: Any=None, blockSize: int=4096) -> None:
+        if numpy is None:
+            raise ImportError('NumpyRandom requires numpy')
+        self.blockSize: int = blockSize
+        self._floats: List[float] = []
+        self._words: List[int] = []
+        super().__init__(a)
+
+    def seed(self, a: Any=None, version: int=2) -> None:
+        if a is not None and not isinstance(a, int):
+            # str hashes are salted per process, so hash the text instead
+            a = int.from_bytes(hashlib.sha512(str(a).encode()).digest(),
+                               'big')
+        self._generator: Any = numpy.random.default_rng(a)
+        self._floats = []
+        self._words = []
+
+    def getstate(self) -> Any:
+        raise NotImplementedError('NumpyRandom does not export its state')
+
+    def setstate(self, state: Any) -> None:
+        raise NotImplementedError('NumpyRandom does not export its state')
+
+    def random(self) -> float:
+        if not self._floats:
+            self._floats = self._generator.random(self.blockSize).tolist()
+        return self._floats.pop()
+
+    def _word(self) -> int:
+        if not self._words:
+            self._words = self._generator.bit_generator.random_raw(
+                self.blockSize).tolist()
+        return self._words.pop()
+
+    def getrandbits(self, k: int) -> int:
+        return _wordBits(self._word, k)
+
+
+def _wordBits(word: Callable[[], int], k: int) -> int:
+    '''
+    k random bits from a source of random 64 bit words
+    '''
+    if k < 0:
+        raise ValueError('number of bits must be non-negative')
+    if k <= 64:
+        return word() >> (64 - k)
+    words: int = (k + 63) // 64
+    value: int = 0
+    for _ in range(words):
+        value = value << 64 | word()
+    return value >> (words * 64 - k)
+
+
+backends: List[str] = ['random', 'urandom', 'numpy']
+
+
+def create(backend: str,
+           seed: Optional[str]=None,
+           blockSize: int=4096) -> random.Random:
+    '''
+    A new generator of the named backend, seeded when seed is not None
+
+    urandom cannot be seeded and ignores the seed
+    '''
+    if backend == 'random':
+        return random.Random(seed)
+    if backend == 'urandom':
+        return UrandomRandom(blockSize)
+    if backend == 'numpy':
+        return NumpyRandom(seed, blockSize)
+    raise ValueError(f'Unknown random backend: {backend}')
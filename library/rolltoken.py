@@ -0,0 +1,86 @@
+﻿import re
+from typing import Dict, Match, NamedTuple, Optional, Pattern  # noqa: F401
+
+from . import dice
+
+Hexadecimal: str = 'hexadecimal'
+Binary: str = 'binary'
+Integer: str = 'integer'
+Float: str = 'float'
+Dice: str = 'dice'
+Keyword: str = 'keyword'
+Other: str = 'other'
+
+_digits: str = r'\d(?:_?\d)*'
+_decimal: str = (rf'(?:(?:{_digits})?\.{_digits}|{_digits}\.?)'
+                 rf'(?:[eE][+-]?{_digits})?')
+_real: str = rf'(?:{_decimal}|inf(?:inity)?|nan)'
+_complexBody: str = (rf'[+-]?{_real}(?:[+-]{_real}?j)?'
+                     rf'|[+-]?{_real}?j')
+
+# Classifies a roll argument the same way the int(), float() and the radix
+# patterns used to, but in a single pass
+_tokenPattern: Pattern[str] = re.compile(rf'''
+    (?P<hexadecimal>(?P<hexPrefix>0[xX]|\$)(?P<hexDigits>[0-9a-fA-F]+))
+    |(?P<binary>(?P<binPrefix>0[bB]|%)(?P<binDigits>[01]+))
+    |(?P<integer>[+-]?{_digits})
+    |(?P<float>[+-]?(?i:{_real}))
+    |(?P<dice>{dice.expressionPattern})
+    ''', re.VERBOSE)
+# complex() parses the argument after every 'i' is replaced with 'j'
+_complexPattern: Pattern[str] = re.compile(
+    rf'{_complexBody}|\(({_complexBody})\)', re.IGNORECASE)
+
+keywords: Dict[str, str] = {
+    'exe': 'exe',
+    'emote': 'emote',
+    'float': 'float',
+    'double': 'float',
+    }
+# Matched case sensitively, unlike the other keywords
+complexKeywords: Dict[str, str] = {
+    'complex': 'complex',
+    'imaginary': 'complex',
+    }
+
+
+class RollToken(NamedTuple):
+    kind: str
+    text: str
+    # Keyword name, or the prefix of a hexadecimal or binary literal
+    prefix: str
+    # Digits of a hexadecimal or binary literal
+    digits: str
+
+    @property
+    def base(self) -> int:
+        return 16 if self.kind == Hexadecimal else 2
+
+    @property
+    def isComplex(self) -> bool:
+        if self.kind in [Hexadecimal, Binary, Dice, Keyword]:
+            return False
+        return isComplex(self.text)
+
+
+def classify(text: str) -> RollToken:
+    keyword: Optional[str] = complexKeywords.get(text)
+    if keyword is None:
+        keyword = keywords.get(text.lower())
+    if keyword is not None:
+        return RollToken(Keyword, text, keyword, '')
+    match: Optional[Match[str]] = _tokenPattern.fullmatch(text)
+    if match is None:
+        return RollToken(Other, text, '', '')
+    kind: str = match.lastgroup
+    if kind == Hexadecimal:
+        return RollToken(kind, text, match.group('hexPrefix'),
+                         match.group('hexDigits'))
+    if kind == Binary:
+        return RollToken(kind, text, match.group('binPrefix'),
+                         match.group('binDigits'))
+    return RollToken(kind, text, '', '')
+
+
+def isComplex(text: str) -> bool:
+    return _complexPattern.fullmatch(text.replace('i', 'j')) is not None
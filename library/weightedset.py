@@ -0,0 +1,124 @@
+﻿import random
+import sys
+from typing import Dict, Hashable, Iterator, List, Optional  # noqa: F401
+
+
+class WeightedSet:
+    '''
+    Members with non-negative weights, O(log n) weight updates and
+    weighted random choice
+
+    The weights are kept in a Fenwick tree over member slots. The tree's
+    size is a power of two so that its last node holds the total weight.
+    Discarded members leave a free slot for the next new member.
+    '''
+    __slots__ = ('_items', '_positions', '_weights', '_tree', '_free')
+
+    def __init__(self) -> None:
+        self._items: List[Optional[Hashable]] = []
+        self._positions: Dict[Hashable, int] = {}
+        self._weights: List[float] = []
+        self._tree: List[float] = [0.0, 0.0]
+        self._free: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, item: object) -> bool:
+        return item in self._positions
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._positions)
+
+    @property
+    def total(self) -> float:
+        return self._tree[-1]
+
+    def weight(self, item: Hashable) -> float:
+        position: Optional[int] = self._positions.get(item)
+        return 0.0 if position is None else self._weights[position]
+
+    def set(self, item: Hashable, weight: float) -> None:
+        position: Optional[int] = self._positions.get(item)
+        if position is None:
+            if self._free:
+                position = self._free.pop()
+                self._items[position] = item
+            else:
+                position = len(self._items)
+                if position == len(self._tree) - 1:
+                    self._grow()
+                self._items.append(item)
+                self._weights.append(0.0)
+            self._positions[item] = position
+        self._add(position, weight - self._weights[position])
+        self._weights[position] = weight
+
+    def discard(self, item: Hashable) -> None:
+        position: Optional[int] = self._positions.pop(item, None)
+        if position is None:
+            return
+        self._add(position, -self._weights[position])
+        self._weights[position] = 0.0
+        self._items[position] = None
+        self._free.append(position)
+
+    def scale(self, factor: float) -> None:
+        '''
+        Multiply every weight by factor, O(n)
+        '''
+        self._weights = [weight * factor for weight in self._weights]
+        self._rebuild(len(self._tree) - 1)
+
+    def choice(self, rng: Optional[random.Random]=None) -> Hashable:
+        '''
+        A member drawn with probability proportional to its weight
+        '''
+        rand = random.random if rng is None else rng.random
+        tree: List[float] = self._tree
+        size: int = len(tree) - 1
+        # Rounding in the tree can land on a slot with no weight, draw again
+        for _ in range(16):
+            remaining: float = rand() * tree[size]
+            position: int = 0
+            step: int = size
+            while step:
+                node: int = position + step
+                if tree[node] <= remaining:
+                    position = node
+                    remaining -= tree[node]
+                step >>= 1
+            if position < len(self._items) and self._weights[position] > 0:
+                return self._items[position]
+        raise IndexError('Cannot choose from a set without weight')
+
+    def memoryUsage(self) -> int:
+        # Nicks are shared with their owner and not counted
+        size: int = sys.getsizeof(self)
+        container: object
+        for container in [self._items, self._positions, self._weights,
+                          self._tree, self._free]:
+            size += sys.getsizeof(container)
+        return size + sys.getsizeof(0.0) * (len(self._weights)
+                                            + len(self._tree))
+
+    def _add(self, position: int, delta: float) -> None:
+        tree: List[float] = self._tree
+        node: int = position + 1
+        while node < len(tree):
+            tree[node] += delta
+            node += node & -node
+
+    def _grow(self) -> None:
+        self._rebuild(2 * (len(self._tree) - 1))
+
+    def _rebuild(self, size: int) -> None:
+        # Linear time construction from the weights
+        tree: List[float] = [0.0] * (size + 1)
+        tree[1:len(self._weights) + 1] = self._weights
+        node: int
+        for node in range(1, size + 1):
+            parent: int = node + (node & -node)
+            if parent <= size:
+                tree[parent] += tree[node]
+        self._tree = tree
@@ -0,0 +1,106 @@
+﻿import asyncio
+import random
+import time
+from typing import Dict, Optional, Set  # noqa: F401
+
+from . import chatters, presence, settings
+
+# Channel -> when !winner was last used
+_watched: Dict[str, float] = {}
+# Channels with a winnerNoLurk, watched until it is cleared
+_configured: Set[str] = set()
+# Channel -> when its next fetch is due
+_due: Dict[str, float] = {}
+# Channel -> failed fetches in a row
+_failures: Dict[str, int] = {}
+_running: Set[str] = set()
+_task: Optional[asyncio.Future] = None
+_slots: Optional[asyncio.Semaphore] = None
+_stats: Dict[str, int] = {
+    'fetches': 0,
+    'failures': 0,
+    }
+
+
+def watch(channel: str) -> None:
+    '''
+    Keep the channel's chatters warm for settings.prefetchWindow seconds
+    '''
+    _watched[channel] = time.monotonic()
+    _start()
+
+
+def configure(channel: str, noLurk: bool) -> None:
+    '''
+    Keep the channel's chatters warm for as long as it has a winnerNoLurk
+    '''
+    if noLurk:
+        _configured.add(channel)
+        _start()
+    else:
+        _configured.discard(channel)
+
+
+def _start() -> None:
+    global _task
+    if _task is None or _task.done():
+        _task = asyncio.ensure_future(_schedule())
+
+
+def _jittered(seconds: float) -> float:
+    return seconds * random.uniform(1 - settings.prefetchJitter,
+                                    1 + settings.prefetchJitter)
+
+
+async def _schedule() -> None:
+    while _watched or _configured:
+        now: float = time.monotonic()
+        channel: str
+        for channel in list(_watched):
+            if now - _watched[channel] >= settings.prefetchWindow:
+                del _watched[channel]
+        for channel in set(_due) - _watched.keys() - _configured:
+            del _due[channel]
+            _failures.pop(channel, None)
+        for channel in _watched.keys() | _configured:
+            if channel in _running or now < _due.get(channel, 0.0):
+                continue
+            # Users tracked from IRC make the chatters list unneeded
+            if presence.ready(channel):
+                _due[channel] = now + _jittered(settings.prefetchInterval)
+                continue
+            _running.add(channel)
+            asyncio.ensure_future(_fetch(channel))
+        await asyncio.sleep(_jittered(settings.prefetchInterval) / 4)
+
+
+async def _fetch(channel: str) -> None:
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(settings.prefetchConcurrency)
+    status: Optional[int] = None
+    try:
+        async with _slots:
+            _stats['fetches'] += 1
+            status = await chatters.refresh(channel)
+    except Exception:
+        # A failed fetch backs off like an error response
+        pass
+    finally:
+        _running.discard(channel)
+    interval: float = settings.prefetchInterval
+    if status is None or status // 100 in [4, 5]:
+        _stats['failures'] += 1
+        _failures[channel] = _failures.get(channel, 0) + 1
+        interval = min(interval * 2 ** _failures[channel],
+                       settings.prefetchMaxBackoff)
+    else:
+        _failures.pop(channel, None)
+    _due[channel] = time.monotonic() + _jittered(interval)
+
+
+def stats() -> Dict[str, int]:
+    prefetchStats: Dict[str, int] = dict(_stats)
+    prefetchStats['watched'] = len(_watched.keys() | _configured)
+    prefetchStats['backingOff'] = len(_failures)
+    return prefetchStats
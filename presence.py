@@ -0,0 +1,92 @@
+﻿import asyncio
+import time
+from typing import Dict, Optional  # noqa: F401
+
+import aiohttp
+
+import bot
+
+from . import chatters, settings
+from .library.indexedset import IndexedSet
+from .library.presence import ChannelPresence, PresenceLine
+from .library.presence import EndOfNames, Join, Names, Part, parseLine
+
+_channels: Dict[str, ChannelPresence] = {}
+_reconciled: Dict[str, float] = {}
+_reconciling: Dict[str, 'asyncio.Future[None]'] = {}
+
+
+def handleLine(line: str) -> None:
+    parsed: Optional[PresenceLine] = parseLine(line)
+    if parsed is None:
+        return
+    channel: str = parsed.channel
+    command: str = parsed.command
+    if command in [Join, Part] and parsed.nicks[0] == bot.config.botnick:
+        # Start over on every join of the bot, forget the channel on part
+        _channels.pop(channel, None)
+        _reconciled.pop(channel, None)
+        if command == Join:
+            _channels[channel] = ChannelPresence()
+        return
+    if channel not in _channels:
+        _channels[channel] = ChannelPresence()
+    presence: ChannelPresence = _channels[channel]
+    if command == Join:
+        presence.join(parsed.nicks[0])
+    elif command == Part:
+        presence.part(parsed.nicks[0])
+    elif command == Names:
+        presence.names(parsed.nicks)
+    elif command == EndOfNames:
+        if settings.presenceReconcile is None:
+            presence.trust()
+        else:
+            _startReconcile(channel, presence)
+
+
+def channelUsers(channel: str) -> Optional[IndexedSet]:
+    '''
+    Users in the channel tracked from IRC, None until they are first
+    reconciled with the remote chatters list
+
+    The returned set is live and must not be modified. The first
+    reconciliation starts when the channel's NAMES list ends, after that
+    one is started every settings.presenceReconcile seconds
+    '''
+    presence: Optional[ChannelPresence] = _channels.get(channel)
+    if presence is None:
+        return None
+    if (settings.presenceReconcile is not None
+            and time.monotonic() - _reconciled.get(channel, 0.0)
+            >= settings.presenceReconcile):
+        _startReconcile(channel, presence)
+    return presence.users if presence.ready else None
+
+
+def ready(channel: str) -> bool:
+    presence: Optional[ChannelPresence] = _channels.get(channel)
+    return presence is not None and presence.ready
+
+
+def _startReconcile(channel: str, presence: ChannelPresence) -> None:
+    if channel in _reconciling:
+        return
+    # Journal from now on, lines may arrive before the task first runs
+    _reconciled[channel] = time.monotonic()
+    presence.beginReconcile()
+    future: asyncio.Future = asyncio.ensure_future(
+        reconcile(channel, presence))
+    _reconciling[channel] = future
+    future.add_done_callback(lambda f: _reconciling.pop(channel, None))
+
+
+async def reconcile(channel: str, presence: ChannelPresence) -> None:
+    users: Optional[IndexedSet] = None
+    try:
+        users = await chatters.fetchChatters(channel)
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+        # Tried again settings.presenceReconcile seconds later
+        pass
+    finally:
+        presence.endReconcile(users)
@@ -0,0 +1,35 @@
+﻿import random
+from typing import Dict, Optional  # noqa: F401
+
+from . import settings
+from .library import randomsource
+
+_streams: Dict[str, random.Random] = {}
+
+
+def channelRandom(channel: str) -> random.Random:
+    '''
+    The channel's own random stream, of the settings.rngBackend backend
+
+    With settings.rngSeed set, every channel replays the same draws on
+    each run, seeded by the seed and the channel name
+    '''
+    stream: Optional[random.Random] = _streams.get(channel)
+    if stream is None:
+        seed: Optional[str] = None
+        if settings.rngSeed is not None:
+            seed = f'{settings.rngSeed}:{channel}'
+        stream = randomsource.create(settings.rngBackend, seed,
+                                     settings.rngBlockSize)
+        _streams[channel] = stream
+    return stream
+
+
+def reset(channel: Optional[str]=None) -> None:
+    '''
+    Drop the streams, or one channel's, so they restart from the settings
+    '''
+    if channel is None:
+        _streams.clear()
+    else:
+        _streams.pop(channel, None)
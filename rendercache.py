@@ -0,0 +1,110 @@
+﻿import random
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple  # noqa: F401
+
+from . import settings
+from .library import number
+
+# Values longer than this are rendered without being cached, they rarely
+# come up twice
+_cacheBits: int = 64
+
+# (value, base, width) -> digits, least recently used first
+_strings: OrderedDict = OrderedDict()
+# (minInt, maxInt, base, width) -> digits of every value in the range
+_tables: OrderedDict = OrderedDict()
+_stats: Dict[str, int] = {
+    'hits': 0,
+    'misses': 0,
+    'tableHits': 0,
+    'tableMisses': 0,
+    }
+
+
+def render(value: int, base: number.Base, width: int=0) -> str:
+    '''
+    Digits of value in base, zero padded to width
+
+    The last settings.renderCacheSize results are kept
+    '''
+    base = number.codec(base).base
+    if value.bit_length() > _cacheBits:
+        return number.paddedStr(value, base, width)
+    key: Tuple[int, number.Base, int] = value, base, width
+    digits: Optional[str] = _strings.get(key)
+    if digits is not None:
+        _strings.move_to_end(key)
+        _stats['hits'] += 1
+        return digits
+    _stats['misses'] += 1
+    digits = number.paddedStr(value, base, width)
+    _strings[key] = digits
+    while len(_strings) > settings.renderCacheSize:
+        _strings.popitem(last=False)
+    return digits
+
+
+def rangeTable(minInt: int,
+               maxInt: int,
+               base: number.Base,
+               width: int=0) -> Optional[List[str]]:
+    '''
+    Digits of every value from minInt to maxInt, None when the range holds
+    more than settings.renderTableLimit values
+
+    The last settings.renderTableCount tables are kept
+    '''
+    if not 0 < maxInt - minInt + 1 <= settings.renderTableLimit:
+        return None
+    key: Tuple[int, int, number.Base, int] = minInt, maxInt, base, width
+    table: Optional[List[str]] = _tables.get(key)
+    if table is not None:
+        _tables.move_to_end(key)
+        _stats['tableHits'] += 1
+        return table
+    _stats['tableMisses'] += 1
+    table = number.to_base_many(range(minInt, maxInt + 1), base, width)
+    _tables[key] = table
+    while len(_tables) > settings.renderTableCount:
+        _tables.popitem(last=False)
+    return table
+
+
+def roll(minInt: int,
+         maxInt: int,
+         base: number.Base,
+         width: int=0,
+         rng: Optional[random.Random]=None) -> Tuple[int, str]:
+    '''
+    A value drawn uniformly from minInt to maxInt and its digits
+
+    Consumes rng, or the random module, exactly like
+    randint(minInt, maxInt). Draws from ranges too large for a table skip
+    the cache, they almost never repeat
+    '''
+    table: Optional[List[str]] = rangeTable(minInt, maxInt, base, width)
+    if table is not None:
+        randrange = random.randrange if rng is None else rng.randrange
+        index: int = randrange(len(table))
+        return minInt + index, table[index]
+    randint = random.randint if rng is None else rng.randint
+    value: int = randint(minInt, maxInt)
+    return value, number.paddedStr(value, base, width)
+
+
+def stats() -> Dict[str, int]:
+    '''
+    Counters of this process's caches
+
+    Costly rolls render in the rollcost worker processes, each with caches
+    of its own, so their hits and misses are not counted here
+    '''
+    cacheStats: Dict[str, int] = dict(_stats)
+    cacheStats['strings'] = len(_strings)
+    cacheStats['tables'] = len(_tables)
+    return cacheStats
+
+
+def clear() -> None:
+    _strings.clear()
+    _tables.clear()
@@ -0,0 +1,188 @@
+﻿import asyncio
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Sequence, TypeVar  # noqa: F401,E501
+
+from lib.data.message import Message
+
+from . import settings
+from .library import dice, distribution, rolltoken
+from .library.metrics import Timings
+
+T = TypeVar('T')
+
+Inline: str = 'inline'
+Executor: str = 'executor'
+Rejected: str = 'rejected'
+
+# Fitted to the number codecs and CPython's int() and str(): seconds for one
+# base conversion of a 10000 bit value and how it grows with the size
+_conversionSeconds: float = 0.0007
+_conversionExponent: float = 1.7
+# Seconds per bit of the linear work, the random draw and conversions in
+# power of two bases
+_linearSeconds: float = 3e-9
+# Seconds per die of a dice roll without NumPy
+_dieSeconds: float = 2e-7
+# Seconds per NumPy element operation of a dice distribution
+_statsSeconds: float = 1e-8
+
+# Wall time spent per tier, including the wait for a worker
+timings: Timings = Timings()
+_executor: Optional[ProcessPoolExecutor] = None
+# Limits the costly rolls each channel has running at once
+_channelSlots: Dict[str, asyncio.Semaphore] = {}
+
+
+class TooExpensive(Exception):
+    pass
+
+
+def conversionCost(bits: int, base: int) -> float:
+    '''
+    Estimated seconds to convert a value of bits bits to or from base
+    '''
+    magnitude: int = abs(base)
+    if magnitude & (magnitude - 1) == 0:
+        return bits * _linearSeconds
+    return _conversionSeconds * (bits / 10000) ** _conversionExponent
+
+
+def rollCost(digits: int, base: int, conversions: int) -> float:
+    '''
+    Estimated seconds for a roll over operands of up to digits digits in
+    base that converts conversions values
+    '''
+    bits: int = math.ceil(digits * math.log2(max(abs(base), 2)))
+    return bits * _linearSeconds + conversions * conversionCost(bits, base)
+
+
+def diceCost(plan: dice.DicePlan) -> float:
+    '''
+    Estimated seconds to roll the plan, infinite when it is over the dice
+    caps
+    '''
+    if (plan.dice > settings.diceMaxCount
+            or plan.maxSides > settings.diceMaxSides):
+        return math.inf
+    return (plan.dice + settings.diceMaxExplosions) * _dieSeconds
+
+
+def statsCost(plan: dice.DicePlan) -> float:
+    '''
+    Estimated seconds to compute the plan's distribution, infinite when it
+    is over the dice caps or settings.statsMaxCost
+    '''
+    if (plan.dice > settings.diceMaxCount
+            or plan.maxSides > settings.diceMaxSides):
+        return math.inf
+    cost: float = distribution.workload(plan) * _statsSeconds
+    return cost if cost <= settings.statsMaxCost else math.inf
+
+
+def rollTokensCost(tokens: Sequence[rolltoken.RollToken]) -> float:
+    if len(tokens) == 1 and tokens[0].kind == rolltoken.Dice:
+        plan: Optional[dice.DicePlan] = dice.parse(tokens[0].text)
+        if plan is not None:
+            return diceCost(plan)
+    digits: int = 0
+    base: int = 10
+    token: rolltoken.RollToken
+    for token in tokens:
+        if token.kind in [rolltoken.Hexadecimal, rolltoken.Binary]:
+            base = token.base
+            digits = max(digits, len(token.digits))
+        elif token.kind == rolltoken.Integer:
+            digits = max(digits, len(token.text))
+    # Floats and complex numbers parse in linear time
+    linear: float = sum(len(token.text) for token in tokens) * _linearSeconds
+    return linear + rollCost(digits, base, len(tokens) + 1)
+
+
+def rollBaseCost(message: Message) -> float:
+    b: List[str] = message.command.split('roll-', 1)
+    base: Optional[str] = None if len(b) < 2 else b[1].lower()
+    baseI: int
+    if base == 't':
+        baseI = 3
+    elif base == '!':
+        # At most 35 digits
+        return 0.0
+    else:
+        try:
+            baseI = int(base)
+        except (TypeError, ValueError):
+            return 0.0
+    operands: List[str] = [message[i] for i in range(1, min(len(message), 3))]
+    digits: int = max((len(operand) for operand in operands), default=0)
+    conversions: int = len(operands) + 1
+    if 'full' in message.lower:
+        # The value, min and max are also written in base 10
+        return (rollCost(digits, baseI, conversions)
+                + rollCost(digits, 10, 3))
+    return rollCost(digits, baseI, conversions)
+
+
+def tier(cost: float) -> str:
+    if cost <= settings.rollInlineCost:
+        return Inline
+    if cost <= settings.rollMaxCost:
+        return Executor
+    return Rejected
+
+
+def executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.rollWorkers)
+    return _executor
+
+
+def channelSlots(channel: str) -> asyncio.Semaphore:
+    if channel not in _channelSlots:
+        _channelSlots[channel] = asyncio.Semaphore(
+            settings.rollChannelConcurrency)
+    return _channelSlots[channel]
+
+
+def _seeded(seed: int, func: Callable[..., T], *args: Any) -> T:
+    return func(*args, rng=random.Random(seed))
+
+
+async def run(channel: str,
+              cost: float,
+              func: Callable[..., T],
+              *args: Any,
+              rng: Optional[random.Random]) -> T:
+    '''
+    Call func(*args, rng=rng) in the tier of its estimated cost, or
+    func(*args) when rng is None
+
+    Cheap calls run inline. Costlier ones run in a worker process, at most
+    settings.rollChannelConcurrency at a time per channel, so that big
+    number arithmetic never holds the event loop's GIL. A worker gets a
+    random.Random seeded from rng, so seeded streams still replay. Raises
+    TooExpensive instead of running calls over settings.rollMaxCost
+    '''
+    global _executor
+    rollTier: str = tier(cost)
+    if rollTier == Rejected:
+        timings.record(Rejected, 0.0)
+        raise TooExpensive()
+    with timings.time(rollTier):
+        if rollTier == Inline:
+            return func(*args) if rng is None else func(*args, rng=rng)
+        async with channelSlots(channel):
+            loop: asyncio.AbstractEventLoop = asyncio.get_event_loop()
+            try:
+                if rng is None:
+                    return await loop.run_in_executor(executor(), func,
+                                                      *args)
+                return await loop.run_in_executor(
+                    executor(), _seeded, rng.getrandbits(64), func, *args)
+            except BrokenProcessPool:
+                # A worker died, start a fresh pool for the next roll
+                _executor = None
+                raise
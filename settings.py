@@ -0,0 +1,108 @@
+﻿# Tunables for the random plugin. Values are read at call time, so they can
+# be overridden at runtime by assigning to the module attributes.
+
+from typing import Optional  # noqa: F401
+
+# Seconds of chat activity kept per channel for the !winner no-lurk filter.
+# A channel's window is widened automatically to its winnerNoLurk setting.
+activityRetention: int = 86400
+
+# With the winnerweighted feature, !winner odds are winnerWeightBase plus
+# the user's recent messages: each message counts 1, up to winnerWeightCap,
+# and halves every winnerWeightHalfLife seconds. Changes apply to channels
+# whose activity starts being tracked afterwards. A winner takes at most
+# winnerWeightAttempts weighted candidates before the rest are drawn
+# uniformly
+winnerWeightBase: float = 1.0
+winnerWeightCap: float = 10.0
+winnerWeightHalfLife: float = 600.0
+winnerWeightAttempts: int = 64
+
+# Shared HTTP client: maximum pooled connections and idle keep-alive seconds
+httpPoolSize: int = 10
+httpKeepAlive: float = 30.0
+# Seconds between checks for the bot shutting down, the shared session is
+# closed within this long of it
+httpShutdownPoll: float = 2.0
+
+# Base URLs, overridable to point at a local stub server
+tmiUrl: str = 'http://tmi.twitch.tv'
+twitchApiUrl: str = 'https://api.twitch.tv'
+
+# Seconds a channel's merged chatters list is reused before refetching
+chattersTtl: float = 30.0
+# Seconds !winner waits for the chatters list before using the expired list
+# or the IRC users. A fetch sends a second request when the first has not
+# answered within the chattersHedgePercentile of past response times, or
+# within chattersHedgeDelay seconds until chattersHedgeSamples responses
+# have been timed
+chattersDeadline: float = 2.0
+chattersHedgePercentile: float = 0.9
+chattersHedgeDelay: float = 1.0
+chattersHedgeSamples: int = 20
+
+# Channels that used !winner in the last prefetchWindow seconds, or that
+# have a winnerNoLurk, get their chatters refetched in the background every
+# prefetchInterval seconds, give or take prefetchJitter of it. Keep the
+# longest interval under chattersTtl so that draws find a warm cache. At
+# most prefetchConcurrency fetches run at once, and failed fetches back
+# off exponentially up to prefetchMaxBackoff seconds. A winnerNoLurk is
+# picked up from the first chat message after the bot joins the channel
+prefetchWindow: float = 3600.0
+prefetchInterval: float = 20.0
+prefetchJitter: float = 0.2
+prefetchConcurrency: int = 4
+prefetchMaxBackoff: float = 600.0
+
+# Seconds between reconciling the users tracked from IRC JOIN, PART and
+# NAMES with the chatters list. !winner uses those users only after their
+# first reconciliation. None trusts IRC alone once NAMES ends, which only
+# suits small channels: Twitch cuts NAMES down to the operators past about
+# 1000 chatters
+presenceReconcile: Optional[float] = 600.0
+
+# Largest N accepted by !winner N
+winnerMaxCount: int = 50
+
+# Longest chat message the plugin builds before starting a new one
+messageLimit: int = 500
+
+# Seconds !winner waits for follow checks before announcing without them
+followDeadline: float = 2.0
+# Seconds a user's follow status is reused for the same channel
+followCacheTtl: float = 600.0
+
+# Seconds a channel's feature and chat property snapshot is reused
+snapshotTtl: float = 60.0
+
+# Rendered roll results kept per (value, base, width)
+renderCacheSize: int = 4096
+# Rolls over ranges of at most this many values draw from a prebuilt table
+# of every result; the last renderTableCount tables are kept
+renderTableLimit: int = 1024
+renderTableCount: int = 64
+
+# Estimated seconds of CPU a roll may spend on the event loop. Costlier rolls
+# run in one of rollWorkers processes, at most rollChannelConcurrency at a
+# time per channel, and rolls over rollMaxCost are refused
+rollInlineCost: float = 0.005
+rollMaxCost: float = 2.0
+rollWorkers: int = 2
+rollChannelConcurrency: int = 1
+
+# Caps on dice rolls such as !roll 4d6kh3+2: dice per roll, faces per die
+# and extra dice rolled by exploding (!) dice
+diceMaxCount: int = 10000
+diceMaxSides: int = 1000000
+diceMaxExplosions: int = 1000
+# Estimated seconds !roll-stats may spend on a dice distribution; bigger
+# expressions are refused
+statsMaxCost: float = 0.5
+
+# Random number backend for rolls, choices and winners: 'random' (Mersenne
+# Twister), 'urandom' (buffered os.urandom) or 'numpy' (NumPy Generator).
+# rngBlockSize is the urandom refill or NumPy block size. Setting rngSeed
+# makes every channel's draws replay identically, urandom ignores it
+rngBackend: str = 'random'
+rngBlockSize: int = 4096
+rngSeed: Optional[str] = None
@@ -0,0 +1,83 @@
+﻿import asyncio
+import time
+from functools import wraps
+from typing import Awaitable, Callable, Dict, FrozenSet, List, NamedTuple  # noqa: F401,E501
+from typing import Optional, Tuple  # noqa: F401
+
+from lib.cache import CacheStore
+from lib.data import ChatCommand, ChatCommandArgs
+
+from . import settings
+from .items.feature import features as pluginFeatures
+
+# Chat properties of this plugin that are kept in the snapshot
+chatProperties: Tuple[str, ...] = ('winnerNoLurk',)
+
+
+class ChannelSnapshot(NamedTuple):
+    fetched: float
+    features: FrozenSet[str]
+    properties: Dict[str, Optional[str]]
+
+
+_snapshots: Dict[str, ChannelSnapshot] = {}
+# Bumped on invalidate so that a reload racing a write is not stored
+_generations: Dict[str, int] = {}
+
+
+async def channelSnapshot(data: CacheStore,
+                          channel: str) -> ChannelSnapshot:
+    '''
+    The plugin's features and chat properties for the channel
+
+    Reloaded from the cache store after settings.snapshotTtl seconds or
+    after invalidate() is called
+    '''
+    snapshot: Optional[ChannelSnapshot] = _snapshots.get(channel)
+    if (snapshot is not None
+            and time.monotonic() - snapshot.fetched < settings.snapshotTtl):
+        return snapshot
+    generation: int = _generations.get(channel, 0)
+    features: List[str] = list(pluginFeatures())
+    enabled: List[bool] = await asyncio.gather(
+        *[data.hasFeature(channel, f) for f in features])
+    values: List[Optional[str]] = await asyncio.gather(
+        *[data.getChatProperty(channel, p) for p in chatProperties])
+    snapshot = ChannelSnapshot(
+        time.monotonic(),
+        frozenset(f for f, e in zip(features, enabled) if e),
+        dict(zip(chatProperties, values)))
+    if _generations.get(channel, 0) == generation:
+        _snapshots[channel] = snapshot
+    return snapshot
+
+
+async def hasFeature(data: CacheStore, channel: str, feature: str) -> bool:
+    snapshot: ChannelSnapshot = await channelSnapshot(data, channel)
+    return feature in snapshot.features
+
+
+async def getChatProperty(data: CacheStore,
+                          channel: str,
+                          key: str) -> Optional[str]:
+    snapshot: ChannelSnapshot = await channelSnapshot(data, channel)
+    return snapshot.properties[key]
+
+
+def invalidate(channel: str) -> None:
+    _snapshots.pop(channel, None)
+    _generations[channel] = _generations.get(channel, 0) + 1
+
+
+def not_feature(feature: str) -> Callable[[ChatCommand], ChatCommand]:
+    '''
+    Like lib.helper.chat.not_feature, but answered from the snapshot
+    '''
+    def decorator(func: ChatCommand) -> ChatCommand:
+        @wraps(func)
+        async def command(args: ChatCommandArgs) -> bool:
+            if await hasFeature(args.data, args.chat.channel, feature):
+                return False
+            return await func(args)
+        return command
+    return decorator
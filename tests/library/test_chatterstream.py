@@ -0,0 +1,119 @@
+﻿import json
+import random
+import unittest
+from typing import Any, Dict, List  # noqa: F401
+
+from ...library.chatterstream import ChattersDecoder
+
+groups: List[str] = ['viewers', 'moderators', 'global_mods', 'admins',
+                     'staff']
+
+_nameChars: str = 'abcdefghijklmnopqrstuvwxyz0123456789_'
+_oddChars: List[str] = ['"', '\\', 'é', '名', '\U0001F600', ' ', ',', ']',
+                        '[', ':', '{', '\n', ' ']
+
+
+def expectedNames(document: Dict[str, Any]) -> List[str]:
+    names: List[str] = []
+    group: str
+    for group, members in document.get('chatters', {}).items():
+        if group in groups:
+            names += members
+    return names
+
+
+def decodeChunks(chunks: List[bytes]) -> List[str]:
+    decoder: ChattersDecoder = ChattersDecoder(groups)
+    names: List[str] = []
+    chunk: bytes
+    for chunk in chunks:
+        names += decoder.feed(chunk)
+    names += decoder.close()
+    return names
+
+
+class TestChattersDecoder(unittest.TestCase):
+    def setUp(self) -> None:
+        self.random: random.Random = random.Random(2018)
+
+    def name(self) -> str:
+        chars: List[str] = [self.random.choice(_nameChars)
+                            for _ in range(self.random.randint(1, 25))]
+        if self.random.random() < 0.1:
+            chars.insert(self.random.randint(0, len(chars)),
+                         self.random.choice(_oddChars))
+        return ''.join(chars)
+
+    def document(self) -> Dict[str, Any]:
+        chatters: Dict[str, Any] = {}
+        group: str
+        for group in self.random.sample(groups + ['vips', 'broadcaster'],
+                                        self.random.randint(0, 7)):
+            chatters[group] = [self.name() for _ in range(
+                self.random.choice([0, 1, 2, 10, 300]))]
+        document: Dict[str, Any] = {
+            '_links': {'self': None, 'list': [1, 2.5, -3e4, True, False]},
+            'chatter_count': sum(map(len, chatters.values())),
+            'chatters': chatters,
+            }
+        if self.random.random() < 0.5:
+            document['trailer'] = {'chatters': {'viewers': ['not', 'me']}}
+        return document
+
+    def encode(self, document: Dict[str, Any]) -> bytes:
+        text: str = json.dumps(
+            document, ensure_ascii=self.random.random() < 0.5,
+            indent=self.random.choice([None, 0, 2]),
+            separators=self.random.choice([None, (',', ':'), (' , ', ' : ')]))
+        return text.encode()
+
+    def split(self, body: bytes) -> List[bytes]:
+        # Cuts land anywhere, inside names, escapes and UTF-8 sequences
+        cuts: List[int] = sorted(self.random.sample(
+            range(1, len(body)), min(len(body) - 1,
+                                     self.random.choice([1, 5, 50, 500]))))
+        return [body[start:end]
+                for start, end in zip([0] + cuts, cuts + [len(body)])]
+
+    def test_random_chunks(self) -> None:
+        index: int
+        for index in range(500):
+            document: Dict[str, Any] = self.document()
+            body: bytes = self.encode(document)
+            with self.subTest(index=index):
+                self.assertEqual(decodeChunks(self.split(body)),
+                                 expectedNames(document))
+
+    def test_single_chunk_and_bytes(self) -> None:
+        document: Dict[str, Any] = self.document()
+        body: bytes = self.encode(document)
+        self.assertEqual(decodeChunks([body]), expectedNames(document))
+        self.assertEqual(decodeChunks([body[i:i + 1]
+                                       for i in range(len(body))]),
+                         expectedNames(document))
+
+    def test_truncated(self) -> None:
+        body: bytes = self.encode(self.document())
+        end: int
+        for end in self.random.sample(range(len(body)), 50):
+            with self.subTest(end=end):
+                self.assertRaises(ValueError, decodeChunks,
+                                  self.split(body[:end] + b' ')
+                                  if end else [b''])
+
+    def test_invalid(self) -> None:
+        body: bytes
+        for body in [b'[]', b'{"chatters": {"viewers": ["a", "b"]}}}',
+                     b'{"chatters": {"viewers": ["a" "b"]}}',
+                     b'{"chatters": {"viewers": ["a",, "b"]}}',
+                     b'{"chatters": {"viewers": ["a"]}} {}',
+                     b'{"chatters": {"viewers": ["\xff"]}}',
+                     b'{"chatters": {"viewers": ["a"]}']:
+            with self.subTest(body=body):
+                self.assertRaises(ValueError, decodeChunks, [body])
+
+    def test_other_groups_skipped(self) -> None:
+        body: bytes = json.dumps({'chatters': {
+            'vips': ['v'], 'viewers': ['a'], 'broadcaster': ['b'],
+            'staff': ['s']}}).encode()
+        self.assertEqual(decodeChunks([body]), ['a', 's'])
@@ -0,0 +1,41 @@
+﻿import random
+import unittest
+from typing import List, Optional  # noqa: F401
+
+from ...library import dice
+
+
+class TestDiceParse(unittest.TestCase):
+    def test_parse(self) -> None:
+        plan: Optional[dice.DicePlan] = dice.parse('4D6kh3+2-d4!')
+        self.assertIsNotNone(plan)
+        assert plan is not None
+        self.assertEqual(plan.terms, (
+            dice.DiceTerm(1, 4, 6, 3, True, False),
+            dice.DiceTerm(1, 2, 0, 0, True, False),
+            dice.DiceTerm(-1, 1, 4, 0, True, True)))
+        self.assertEqual(plan.dice, 5)
+        self.assertEqual(plan.maxSides, 6)
+        self.assertEqual(plan.text, '4d6kh3+2-1d4!')
+
+    def test_not_dice(self) -> None:
+        text: str
+        for text in ['', '6', 'd', '0d6', '2d0', '2d6k0', '2d1!', '2d6+',
+                     '2d6*2', 'd6d6']:
+            with self.subTest(text=text):
+                self.assertIsNone(dice.parse(text))
+
+    def test_long_numbers(self) -> None:
+        # Over 4300 digits int() raises, these used to escape !roll
+        long: str = '1' * 5000
+        text: str
+        for text in [f'1d1{long}', f'{long}d6', f'1d6+1{long}',
+                     f'2d6k{long}', f'1d6-{long}']:
+            with self.subTest(text=text[:20]):
+                self.assertIsNone(dice.parse(text))
+        limit: str = '9' * 1000
+        plan: Optional[dice.DicePlan] = dice.parse(f'1d6+{limit}+{limit}')
+        self.assertIsNotNone(plan)
+        assert plan is not None
+        total: int = dice.roll(plan, random.Random(2018)).total
+        self.assertEqual(len(str(total)), 1001)
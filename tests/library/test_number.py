@@ -0,0 +1,340 @@
+﻿import random
+import unittest
+from typing import Callable, List, Union  # noqa: F401
+
+from ...library import number
+
+Result = Union[int, str]
+
+_alphabet: str = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+bases: List[number.Base] = [
+    *range(2, 37), *range(-36, -1), 't', '!']
+
+
+# The digit by digit conversions from before the codec registry, kept as the
+# reference the codecs must agree with
+def referenceDigit(char: str) -> int:
+    if '0' <= char <= '9':
+        return ord(char) - ord('0')
+    if 'A' <= char.upper() <= 'Z':
+        return ord(char.upper()) - ord('A') + 10
+    raise ValueError(f'Invalid char: {char}')
+
+
+def referenceStr(value: int, base: number.Base) -> str:
+    digits: str = ''
+    if base == '!':
+        if value < 0:
+            raise ValueError('factorial base does not have negative numbers')
+        radix: int = 1
+        while value != 0:
+            remainder: int
+            value, remainder = divmod(value, radix)
+            digits = _alphabet[remainder] + digits
+            radix += 1
+            if radix >= 36:
+                raise ValueError(
+                    'Value too large to represent in factorial base')
+        return digits or '0'
+    if base == 't':
+        trits: List[str] = []
+        while value != 0:
+            remainder = value % 3
+            if remainder == 2:
+                trits.append('T')
+                value += 1
+            else:
+                trits.append(str(remainder))
+            value //= 3
+        return ''.join(reversed(trits)) or '0'
+    assert isinstance(base, int)
+    sign: str = ''
+    if base > 0 and value < 0:
+        sign = '-'
+        value = -value
+    chars: List[str] = []
+    while value != 0:
+        value, remainder = divmod(value, base)
+        if remainder < 0:
+            value, remainder = value + 1, remainder - base
+        chars.append(_alphabet[remainder])
+    return sign + (''.join(reversed(chars)) or '0')
+
+
+def referenceInt(digits: str, base: number.Base) -> int:
+    if base == '!' and len(digits) >= 36:
+        raise ValueError('not enough digits to represent')
+    sign: int = 1
+    if isinstance(base, int) and base > 0 and digits[:1] in ['-', '+']:
+        sign = -1 if digits[0] == '-' else 1
+        digits = digits[1:]
+        if not digits:
+            raise ValueError('value is invalid')
+    num: int = 0
+    i: int
+    char: str
+    if base == '!':
+        power: int = 1
+        for i, char in enumerate(reversed(digits)):
+            bit: int = referenceDigit(char)
+            if bit > i:
+                raise ValueError('invalid literal for factorial base')
+            num += bit * power
+            power *= i + 1
+        return num
+    radix: int = 3 if base == 't' else int(base)
+    for char in digits:
+        if base == 't':
+            if char not in '01Tt':
+                raise ValueError('invalid literal for balanced ternary base')
+            bit = -1 if char in 'Tt' else int(char)
+        else:
+            bit = referenceDigit(char)
+            if bit >= abs(radix):
+                raise ValueError(f'invalid literal for base {base}')
+        num = num * radix + bit
+    return sign * num
+
+
+def outcome(function: Callable[[], Result]) -> Result:
+    try:
+        return function()
+    except ValueError:
+        return 'ValueError'
+
+
+def validChars(base: number.Base) -> str:
+    if base == 't':
+        return '01Tt'
+    if base == '!':
+        return _alphabet[:35]
+    assert isinstance(base, int)
+    chars: str = _alphabet[:abs(base)]
+    return chars + chars[10:].lower()
+
+
+class TestNumberCodecs(unittest.TestCase):
+    def setUp(self) -> None:
+        self.random: random.Random = random.Random(2017)
+
+    def values(self, base: number.Base) -> List[int]:
+        values: List[int] = list(range(-300, 301))
+        if base == '!':
+            values += [self.random.randrange(2 ** bits) for bits in range(
+                1, 133) for _ in range(4)]
+            values += [3 ** 73, 2 ** 200]
+            return values
+        bits: int
+        for bits in [62, 63, 64, 65, 100, 1000, 2047, 2048, 2049, 5000,
+                     16000]:
+            value: int = self.random.getrandbits(bits) | 1 << bits - 1
+            values += [value, -value]
+            if bits < 5000:
+                values += [value - 1, -value + 1]
+        radix: int = 3 if base == 't' else abs(int(base))
+        values += [radix ** 500, radix ** 500 - 1, -radix ** 500]
+        return values
+
+    def digitStrings(self, base: number.Base) -> List[str]:
+        chars: str = validChars(base)
+        strings: List[str] = []
+        length: int
+        for length in [1, 2, 5, 15, 16, 17, 20, 35, 36, 100, 4096, 4097,
+                       5000]:
+            if base == '!' and length > 36:
+                continue
+            for _ in range(4 if length < 1000 else 1):
+                strings.append(''.join(self.random.choice(chars)
+                                       for _ in range(length)))
+        if base == '!':
+            # Valid factorial digits: at most the position's index
+            strings += [''.join(_alphabet[self.random.randint(0, i)]
+                                for i in reversed(range(length)))
+                        for length in range(1, 36)]
+        if isinstance(base, int) and base > 0:
+            strings += ['-' + string for string in strings[:20]]
+            strings += ['+' + string for string in strings[:5]]
+            strings += ['-0', '+0', '00', '0' * 50 + '1']
+        return strings
+
+    def test_encode(self) -> None:
+        base: number.Base
+        for base in bases:
+            codec: number.Codec = number.codec(base)
+            value: int
+            for value in self.values(base):
+                with self.subTest(base=base, value=hex(value)[:40]):
+                    self.assertEqual(
+                        outcome(lambda: codec.encode(value)),
+                        outcome(lambda: referenceStr(value, base)))
+
+    def test_decode(self) -> None:
+        base: number.Base
+        for base in bases:
+            codec: number.Codec = number.codec(base)
+            string: str
+            for string in self.digitStrings(base):
+                with self.subTest(base=base, string=string[:40]):
+                    self.assertEqual(
+                        outcome(lambda: codec.decode(string)),
+                        outcome(lambda: referenceInt(string, base)))
+
+    def test_round_trip(self) -> None:
+        base: number.Base
+        for base in bases:
+            codec: number.Codec = number.codec(base)
+            value: int
+            for value in self.values(base):
+                if base == '!' and value < 0:
+                    continue
+                with self.subTest(base=base, value=hex(value)[:40]):
+                    encoded: Result = outcome(lambda: codec.encode(value))
+                    if encoded != 'ValueError':
+                        assert isinstance(encoded, str)
+                        self.assertEqual(codec.decode(encoded), value)
+
+    def test_decode_invalid(self) -> None:
+        base: number.Base
+        for base in bases:
+            codec: number.Codec = number.codec(base)
+            invalid: List[str] = ['-', '+', '--1', '1-', '1.0', 'é', '\0',
+                                  '1\0', '#', 'Z' * 3]
+            if isinstance(base, int) and abs(base) < 36:
+                invalid.append(_alphabet[abs(base)])
+                invalid.append('1' * 20 + _alphabet[abs(base)].lower())
+            if base == '!':
+                invalid += ['1' * 36, '2', '10' * 18]
+            if base == 't':
+                invalid += ['2', '1T2']
+            string: str
+            for string in invalid:
+                if string == 'Z' * 3 and base in [36, -36]:
+                    continue
+                with self.subTest(base=base, string=string):
+                    self.assertEqual(outcome(lambda: codec.decode(string)),
+                                     'ValueError')
+                    self.assertEqual(
+                        outcome(lambda: referenceInt(string, base)),
+                        'ValueError')
+
+    def test_decode_empty(self) -> None:
+        # An empty string used to be 0 for the negative, balanced and
+        # factorial bases, every codec rejects it now
+        base: number.Base
+        for base in bases:
+            with self.subTest(base=base):
+                self.assertRaises(ValueError, number.codec(base).decode, '')
+        self.assertRaises(ValueError, number.negativeBaseInt, '', -10)
+        self.assertRaises(ValueError, number.balancedBaseInt, '')
+        self.assertRaises(ValueError, number.factorialBaseInt, '')
+        self.assertRaises(ValueError, number.Number, '', 10)
+
+    def test_decode_positive_strict(self) -> None:
+        # int() accepts these, the positive base codecs take only a sign
+        # and ASCII digits
+        string: str
+        for string in [' 5', '5 ', '1_0', '٣', '0x1f']:
+            with self.subTest(string=string):
+                self.assertRaises(ValueError, number.codec(16).decode, string)
+
+    def test_codec_invalid_base(self) -> None:
+        base: number.Base
+        for base in [-37, -1, 0, 1, 37, 'x', '', 'tt']:
+            with self.subTest(base=base):
+                self.assertRaises(ValueError, number.codec, base)
+        self.assertIs(number.codec('T'), number.codec('t'))
+
+    def test_codec_abstract(self) -> None:
+        self.assertRaises(TypeError, number.Codec)
+        # Factorial base has no array conversion
+        self.assertIsNone(number.codec('!').arrayStep([1, 2]))
+        self.assertEqual(number.to_base_many([0, 5, 23], '!'),
+                         ['0', '210', '3210'])
+
+    def test_free_functions(self) -> None:
+        value: int = self.random.getrandbits(3000)
+        self.assertEqual(number.positiveBaseStr(-value, 7),
+                         referenceStr(-value, 7))
+        self.assertEqual(number.negativeBaseStr(value, -7),
+                         referenceStr(value, -7))
+        self.assertEqual(number.balancedBaseStr(-value),
+                         referenceStr(-value, 't'))
+        self.assertEqual(number.factorialBaseStr(10 ** 30),
+                         referenceStr(10 ** 30, '!'))
+        self.assertEqual(number.negativeBaseInt('1AZ', -36),
+                         referenceInt('1AZ', -36))
+        self.assertEqual(number.balancedBaseInt('1T0t'),
+                         referenceInt('1T0t', 't'))
+        self.assertEqual(number.factorialBaseInt('3210'),
+                         referenceInt('3210', '!'))
+
+    def test_number(self) -> None:
+        base: number.Base
+        for base in bases:
+            value: int
+            for value in [0, 1, 35, 10 ** 20]:
+                with self.subTest(base=base, value=hex(value)[:40]):
+                    num: number.Number = number.Number(value, base)
+                    self.assertEqual(str(num), referenceStr(value, base))
+                    self.assertEqual(int(number.Number(str(num), base)),
+                                     value)
+        self.assertEqual(str(number.Number(10, -3) + 5), referenceStr(15, -3))
+        self.assertRaises(ValueError, number.Number, -1, '!')
+
+
+class TestNumberMany(unittest.TestCase):
+    def setUp(self) -> None:
+        self.random: random.Random = random.Random(2018)
+
+    def test_to_base_many(self) -> None:
+        values: List[int] = [self.random.randrange(-2 ** 70, 2 ** 70)
+                             for _ in range(200)]
+        values += [2 ** 62 - 1, -2 ** 62 + 1, 2 ** 62, -2 ** 62, 0]
+        base: number.Base
+        for base in bases:
+            if base == '!':
+                continue
+            with self.subTest(base=base):
+                self.assertEqual(
+                    number.to_base_many(values, base),
+                    [referenceStr(value, base) for value in values])
+                self.assertEqual(
+                    number.to_base_many(values, base, width=30),
+                    [number.paddedStr(value, base, 30) for value in values])
+
+    def test_from_base_many(self) -> None:
+        base: number.Base
+        for base in bases:
+            chars: str = validChars(base)
+            strings: List[str] = [
+                ''.join(self.random.choice(chars)
+                        for _ in range(self.random.randint(1, 30)))
+                for _ in range(200)]
+            if base == '!':
+                strings = [referenceStr(self.random.randrange(10 ** 30), '!')
+                           for _ in range(200)]
+            if isinstance(base, int) and base > 0:
+                strings += ['-' + string for string in strings[:50]]
+            with self.subTest(base=base):
+                self.assertEqual(
+                    number.from_base_many(strings, base),
+                    [referenceInt(string, base) for string in strings])
+
+    def test_from_base_many_invalid(self) -> None:
+        string: str
+        for string in ['', '-', '1G', '1\0', '1 ']:
+            with self.subTest(string=string):
+                self.assertRaises(ValueError, number.from_base_many,
+                                  ['1', string], 16)
+
+    @unittest.skipIf(number.numpy is None, 'requires numpy')
+    def test_bytes_round_trip(self) -> None:
+        values: List[int] = [self.random.randrange(-2 ** 61, 2 ** 61)
+                             for _ in range(100)]
+        base: number.Base
+        for base in [2, 10, 16, 36, -2, -10, -36, 't']:
+            with self.subTest(base=base):
+                encoded: object = number.to_base_many(values, base,
+                                                      as_bytes=True)
+                self.assertEqual(number.from_base_many(encoded, base), values)
@@ -0,0 +1,57 @@
+﻿import unittest
+from typing import Any, List  # noqa: F401
+from unittest.mock import patch
+
+from ... import randomstreams, settings
+from ...library import randomsource
+
+
+def draws(channel: str) -> List[Any]:
+    randomstreams.reset(channel)
+    rng: Any = randomstreams.channelRandom(channel)
+    return [[rng.randint(1, 6) for _ in range(50)],
+            [rng.random() for _ in range(50)],
+            [rng.choice('abcdefghij') for _ in range(50)],
+            rng.sample(range(1000), 20),
+            rng.getrandbits(200)]
+
+
+class TestRandomStreams(unittest.TestCase):
+    def setUp(self) -> None:
+        patcher: Any
+        for patcher in [patch.object(settings, 'rngSeed', 'seed'),
+                        patch.object(settings, 'rngBlockSize', 16),
+                        patch.object(randomstreams, '_streams', {})]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def assertReplays(self) -> None:
+        first: List[Any] = draws('channel')
+        self.assertEqual(draws('channel'), first)
+        self.assertNotEqual(draws('other'), first)
+        with patch.object(settings, 'rngSeed', 'another seed'):
+            self.assertNotEqual(draws('channel'), first)
+
+    def test_random_seeded(self) -> None:
+        with patch.object(settings, 'rngBackend', 'random'):
+            self.assertReplays()
+
+    @unittest.skipIf(randomsource.numpy is None, 'requires numpy')
+    def test_numpy_seeded(self) -> None:
+        with patch.object(settings, 'rngBackend', 'numpy'):
+            self.assertReplays()
+
+    def test_urandom_ignores_seed(self) -> None:
+        with patch.object(settings, 'rngBackend', 'urandom'):
+            self.assertIsInstance(randomstreams.channelRandom('channel'),
+                                  randomsource.UrandomRandom)
+            self.assertNotEqual(draws('channel'), draws('channel'))
+
+    def test_stream_kept(self) -> None:
+        self.assertIs(randomstreams.channelRandom('channel'),
+                      randomstreams.channelRandom('channel'))
+        randomstreams.reset()
+        self.assertEqual(randomstreams._streams, {})
+
+    def test_unknown_backend(self) -> None:
+        self.assertRaises(ValueError, randomsource.create, 'dice')
@@ -0,0 +1,165 @@
+﻿import random
+import unittest
+from collections import Counter
+from typing import Dict, Hashable, List  # noqa: F401
+
+from ...library.activity import ActivityTracker
+from ...library.indexedset import IndexedSet
+from ...library.weightedset import WeightedSet
+
+draws: int = 40000
+# About four standard deviations of a frequency near 0.5 over draws
+tolerance: float = 0.01
+
+
+class TestWeightedSet(unittest.TestCase):
+    def setUp(self) -> None:
+        self.random: random.Random = random.Random(2018)
+        self.weights: WeightedSet = WeightedSet()
+
+    def assertOdds(self,
+                   counts: Counter,
+                   weights: Dict[Hashable, float]) -> None:
+        total: float = sum(weights.values())
+        item: Hashable
+        weight: float
+        for item, weight in weights.items():
+            with self.subTest(item=item):
+                self.assertAlmostEqual(counts[item] / draws, weight / total,
+                                       delta=tolerance)
+        self.assertLessEqual(counts.keys(), weights.keys())
+
+    def test_model(self) -> None:
+        model: Dict[Hashable, float] = {}
+        _: int
+        for _ in range(5000):
+            item: int = self.random.randrange(300)
+            if self.random.random() < 0.3:
+                self.weights.discard(item)
+                model.pop(item, None)
+            else:
+                weight: float = self.random.choice(
+                    [0.0, self.random.random(), self.random.random() * 1e6])
+                self.weights.set(item, weight)
+                model[item] = weight
+        self.assertEqual(len(self.weights), len(model))
+        self.assertEqual(set(self.weights), set(model))
+        self.assertAlmostEqual(self.weights.total, sum(model.values()),
+                               delta=1e-6 * sum(model.values()))
+        for item, weight in model.items():
+            self.assertIn(item, self.weights)
+            self.assertEqual(self.weights.weight(item), weight)
+        self.assertNotIn(300, self.weights)
+        self.assertEqual(self.weights.weight(300), 0.0)
+
+    def test_choice_odds(self) -> None:
+        weights: Dict[Hashable, float] = {
+            'a': 1.0, 'b': 2.0, 'c': 7.0, 'd': 0.0, 'e': 0.5}
+        item: Hashable
+        weight: float
+        for item, weight in weights.items():
+            self.weights.set(item, weight)
+        self.weights.discard('e')
+        del weights['e']
+        counts: Counter = Counter(self.weights.choice(self.random)
+                                  for _ in range(draws))
+        self.assertEqual(counts['d'], 0)
+        self.assertOdds(counts, weights)
+
+    def test_choice_after_growth_and_reuse(self) -> None:
+        item: int
+        for item in range(1000):
+            self.weights.set(item, 1.0)
+        for item in range(1000):
+            if item % 10:
+                self.weights.discard(item)
+        self.weights.set('new', 100.0)
+        self.weights.scale(0.5)
+        self.assertEqual(len(self.weights), 101)
+        self.assertAlmostEqual(self.weights.total, 100.0)
+        counts: Counter = Counter(self.weights.choice(self.random)
+                                  for _ in range(draws))
+        self.assertAlmostEqual(counts['new'] / draws, 0.5, delta=tolerance)
+        self.assertTrue(all(item == 'new' or item % 10 == 0
+                            for item in counts))
+
+    def test_choice_without_weight(self) -> None:
+        self.assertRaises(IndexError, self.weights.choice, self.random)
+        self.weights.set('a', 0.0)
+        self.assertRaises(IndexError, self.weights.choice, self.random)
+
+
+class TestSampleWeighted(unittest.TestCase):
+    def setUp(self) -> None:
+        self.random: random.Random = random.Random(2018)
+        self.activity: ActivityTracker = ActivityTracker(86400, 600.0, 10.0)
+        nick: str
+        count: int
+        for nick, count in [('a', 5), ('b', 1), ('outsider', 10)]:
+            for _ in range(count):
+                self.activity.log(nick, 1000)
+        self.pool: IndexedSet = IndexedSet(['a', 'b', 'd', 'e'])
+
+    def test_weights(self) -> None:
+        self.assertAlmostEqual(self.activity.weight('a', 1000), 5.0)
+        self.assertAlmostEqual(self.activity.weight('a', 1600), 2.5)
+        self.assertEqual(self.activity.weight('d', 1000), 0.0)
+        _: int
+        for _ in range(20):
+            self.activity.log('a', 1000)
+        self.assertAlmostEqual(self.activity.weight('a', 1000), 10.0)
+
+    def test_single_draw_odds(self) -> None:
+        counts: Counter = Counter(
+            self.activity.sampleWeighted(self.pool, 1, 1.0, 1000,
+                                         self.random)[0]
+            for _ in range(draws))
+        # Odds of base 1 plus the weight, the outsider is not in the pool
+        self.assertEqual(counts['outsider'], 0)
+        nick: str
+        expected: float
+        for nick, expected in [('a', 0.6), ('b', 0.2), ('d', 0.1),
+                               ('e', 0.1)]:
+            with self.subTest(nick=nick):
+                self.assertAlmostEqual(counts[nick] / draws, expected,
+                                       delta=tolerance)
+
+    def test_decayed_odds(self) -> None:
+        counts: Counter = Counter(
+            self.activity.sampleWeighted(self.pool, 1, 1.0, 1600,
+                                         self.random)[0]
+            for _ in range(draws))
+        # a weighs 2.5 and b 0.5 a half-life later
+        self.assertAlmostEqual(counts['a'] / draws, 3.5 / 7,
+                               delta=tolerance)
+        self.assertAlmostEqual(counts['b'] / draws, 1.5 / 7,
+                               delta=tolerance)
+
+    def test_second_draw_odds(self) -> None:
+        counts: Counter = Counter(
+            tuple(self.activity.sampleWeighted(self.pool, 2, 1.0, 1000,
+                                               self.random))
+            for _ in range(draws))
+        # a then b: 6/10 * 2/4
+        self.assertAlmostEqual(counts['a', 'b'] / draws, 0.3,
+                               delta=tolerance)
+        # d then a: 1/10 * 6/9
+        self.assertAlmostEqual(counts['d', 'a'] / draws, 1 / 15,
+                               delta=tolerance)
+
+    def test_sample_distinct_and_restored(self) -> None:
+        sample: List[Hashable] = self.activity.sampleWeighted(
+            self.pool, 4, 1.0, 1000, self.random)
+        self.assertEqual(sorted(sample), ['a', 'b', 'd', 'e'])
+        self.assertAlmostEqual(self.activity.weight('a', 1000), 5.0)
+        self.assertAlmostEqual(self.activity.weight('outsider', 1000), 10.0)
+        self.assertRaises(ValueError, self.activity.sampleWeighted,
+                          self.pool, 5, 1.0, 1000, self.random)
+
+    def test_attempts_exhausted(self) -> None:
+        # Only outsiders hold weight, so every weighted candidate is
+        # rejected and the winner is drawn uniformly
+        pool: IndexedSet = IndexedSet(['d', 'e'])
+        sample: List[Hashable] = self.activity.sampleWeighted(
+            pool, 2, 0.0, 1000, self.random, 4)
+        self.assertEqual(sorted(sample), ['d', 'e'])
@@ -0,0 +1,105 @@
+﻿import asyncio
+import unittest
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple  # noqa: F401
+from unittest.mock import patch
+
+from .. import channel, prefetch, snapshot
+from ..library import dice
+
+
+class TestRollStats(unittest.TestCase):
+    def setUp(self) -> None:
+        plan: Optional[dice.DicePlan] = dice.parse('1d6')
+        assert plan is not None
+        self.plan: dice.DicePlan = plan
+        self.plain: str = channel.rollStats(self.plan, None, None)
+
+    def test_query(self) -> None:
+        query: str
+        answer: str
+        for query, answer in [('3', 'Chance of =3: 16.67%'),
+                              ('=3', 'Chance of =3: 16.67%'),
+                              ('>=5', 'Chance of >=5: 33.33%'),
+                              ('>5', 'Chance of >5: 16.67%'),
+                              ('<2', 'Chance of <2: 16.67%'),
+                              ('<=2', 'Chance of <=2: 33.33%'),
+                              ('2..4', 'Chance of 2 to 4: 50%'),
+                              ('4..2', 'Chance of 4 to 2: 0%'),
+                              ('-1', 'Chance of =-1: 0%')]:
+            with self.subTest(query=query):
+                self.assertEqual(channel.rollStats(self.plan, query, None),
+                                 f'{self.plain}. {answer}')
+
+    def test_query_invalid(self) -> None:
+        # Ignored, longer numbers would be over int()'s digit limit
+        query: str
+        for query in ['x', '3..', '..3', '=>3', '3.5', '1' + '0' * 5000,
+                      '>' + '9' * 1001, '1..' + '1' * 5000,
+                      '-' + '1' * 5000 + '..1']:
+            with self.subTest(query=query[:20]):
+                self.assertEqual(channel.rollStats(self.plan, query, None),
+                                 self.plain)
+
+    def test_query_long(self) -> None:
+        self.assertEqual(channel.rollStats(self.plan, '1' * 1000, None),
+                         f'{self.plain}. Chance of ={"1" * 1000}: 0%')
+
+    def test_last_total(self) -> None:
+        self.assertEqual(
+            channel.rollStats(self.plan, None, 4),
+            f'{self.plain}. The last roll, 4, ranks above 58.33% of rolls')
+
+
+class Data:
+    def __init__(self, noLurk: Optional[str]) -> None:
+        self.noLurk: Optional[str] = noLurk
+
+    async def hasFeature(self, channel: str, feature: str) -> bool:
+        return False
+
+    async def getChatProperty(self, channel: str, key: str) -> Optional[str]:
+        return self.noLurk if key == 'winnerNoLurk' else None
+
+
+class Chat:
+    def __init__(self, channel: str) -> None:
+        self.channel: str = channel
+        self.sessionData: Dict[Any, Any] = {}
+
+
+class Args:
+    def __init__(self, chat: Chat, data: Data) -> None:
+        self.chat: Chat = chat
+        self.data: Data = data
+        self.nick: str = 'viewer'
+        self.timestamp: datetime = datetime(2018, 1, 1)
+
+
+class TestLogLastMessage(unittest.TestCase):
+    def setUp(self) -> None:
+        self.loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        self.configured: List[Tuple[str, bool]] = []
+        patcher: Any
+        for patcher in [
+                patch.object(snapshot, '_snapshots', {}),
+                patch.object(prefetch, 'configure',
+                             lambda *args: self.configured.append(args))]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def log(self, chat: Chat, data: Data) -> None:
+        self.assertIs(self.loop.run_until_complete(
+            channel.logLastMessage(Args(chat, data))), False)
+
+    def test_configures_prefetch_once(self) -> None:
+        chat: Chat = Chat('giveaway')
+        self.log(chat, Data('600'))
+        self.log(chat, Data('600'))
+        self.log(Chat('quiet'), Data(None))
+        self.assertEqual(self.configured, [('giveaway', True),
+                                           ('quiet', False)])
+        now: int = int(datetime(2018, 1, 1).timestamp())
+        self.assertEqual(chat.sessionData['activity'].weight('viewer', now),
+                         2.0)
@@ -0,0 +1,42 @@
+﻿import asyncio
+import json
+import unittest
+from typing import Any, List, Optional, Tuple  # noqa: F401
+from unittest.mock import patch
+
+from .. import follows, httpclient
+
+
+class TestFollows(unittest.TestCase):
+    def setUp(self) -> None:
+        self.loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        patcher: Any = patch.object(follows, '_cache', {})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def statuses(self, *results: Any) -> List[Optional[bool]]:
+        async def getJson(url: str, headers: Any=None) -> Tuple[int, Any]:
+            result: Any = results[int(url.split('/')[-4])]
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        with patch.object(httpclient, 'getJson', getJson), \
+                patch.object(httpclient, 'twitchHeaders', lambda: {}):
+            return self.loop.run_until_complete(follows.followStatuses(
+                'channel', [str(i) for i in range(len(results))], 1))
+
+    def test_statuses(self) -> None:
+        self.assertEqual(
+            self.statuses((200, {}), (404, None), (500, None),
+                          asyncio.TimeoutError()),
+            [True, False, None, None])
+        self.assertEqual(follows.cachedFollow('0', 'channel'), None)
+        self.assertEqual(follows.cachedFollow('channel', '0'), True)
+        self.assertEqual(follows.cachedFollow('channel', '2'), None)
+
+    def test_malformed_body(self) -> None:
+        error: ValueError = json.JSONDecodeError('Expecting value', '<', 0)
+        self.assertEqual(self.statuses(error, (404, None)), [None, False])
+        self.assertEqual(follows.cachedFollow('channel', '0'), None)
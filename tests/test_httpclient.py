@@ -0,0 +1,112 @@
+﻿import asyncio
+import types
+import unittest
+from typing import Any, Dict, List  # noqa: F401
+from unittest.mock import patch
+
+from .. import httpclient, settings
+
+
+class FakeResponse:
+    def __init__(self, status: int, body: Any) -> None:
+        self.status: int = status
+        self.body: Any = body
+
+    async def __aenter__(self) -> 'FakeResponse':
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        pass
+
+    async def json(self) -> Any:
+        return self.body
+
+
+class FakeSession:
+    '''
+    Stands in for aiohttp.ClientSession, answering every GET from a table
+    of url -> (status, body)
+    '''
+    instances: List['FakeSession'] = []
+    responses: Dict[str, Any] = {}
+
+    def __init__(self, connector: Any=None) -> None:
+        self.connector: Any = connector
+        self.closed: bool = False
+        self.urls: List[str] = []
+        FakeSession.instances.append(self)
+
+    def get(self, url: str, **kwargs: Any) -> FakeResponse:
+        self.urls.append(url)
+        return FakeResponse(*FakeSession.responses[url])
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class TestHttpClient(unittest.TestCase):
+    def setUp(self) -> None:
+        FakeSession.instances = []
+        FakeSession.responses = {
+            'http://stub/ok': (200, {'a': 1}),
+            'http://stub/missing': (404, None),
+            }
+        self.loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        self.running: types.SimpleNamespace = types.SimpleNamespace(
+            running=True)
+        patches: List[Any] = [
+            patch.object(httpclient.aiohttp, 'ClientSession', FakeSession),
+            patch.object(httpclient.aiohttp, 'TCPConnector',
+                         lambda **kwargs: kwargs),
+            patch.object(httpclient.bot, 'globals', self.running,
+                         create=True),
+            patch.object(httpclient.bot, 'config',
+                         types.SimpleNamespace(httpTimeout=1,
+                                               twitchClientId=None),
+                         create=True),
+            patch.object(httpclient, '_session', None),
+            patch.object(httpclient, '_closer', None),
+            patch.object(settings, 'httpShutdownPoll', 0.01),
+            ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self) -> None:
+        # Let the shutdown watcher see the closed session and finish
+        if httpclient._closer is not None:
+            self.loop.run_until_complete(httpclient._closer)
+
+    def test_session_reused(self) -> None:
+        async def requests() -> List[Any]:
+            return [await httpclient.getJson('http://stub/ok'),
+                    await httpclient.getJson('http://stub/missing'),
+                    await httpclient.getJson('http://stub/ok')]
+        self.assertEqual(self.loop.run_until_complete(requests()),
+                         [(200, {'a': 1}), (404, None), (200, {'a': 1})])
+        self.assertEqual(len(FakeSession.instances), 1)
+        self.assertEqual(FakeSession.instances[0].connector,
+                         {'limit': settings.httpPoolSize,
+                          'keepalive_timeout': settings.httpKeepAlive})
+        self.assertEqual(httpclient.poolStats()['open'], 1)
+        self.loop.run_until_complete(httpclient.close())
+
+    def test_close_releases_session(self) -> None:
+        self.loop.run_until_complete(httpclient.getJson('http://stub/ok'))
+        self.loop.run_until_complete(httpclient.close())
+        self.assertTrue(FakeSession.instances[0].closed)
+        self.assertEqual(httpclient.poolStats()['open'], 0)
+        # A later request opens a new session
+        self.loop.run_until_complete(httpclient.getJson('http://stub/ok'))
+        self.assertEqual(len(FakeSession.instances), 2)
+        self.loop.run_until_complete(httpclient.close())
+
+    def test_closed_on_shutdown(self) -> None:
+        async def shutdown() -> None:
+            await httpclient.getJson('http://stub/ok')
+            self.running.running = False
+            await asyncio.sleep(0.05)
+        self.loop.run_until_complete(shutdown())
+        self.assertTrue(FakeSession.instances[0].closed)
+        self.assertEqual(httpclient.poolStats()['open'], 0)